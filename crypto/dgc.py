@@ -147,7 +147,14 @@ class DGC:
         :param dense_int_vector: 1D integer array length = prod(original_shape)
         """
         assert dense_int_vector.size == np.prod(original_shape)
-        return (dense_int_vector.astype(float) * scale).reshape(original_shape)
+        return self.decompress_int_chunk(dense_int_vector, scale).reshape(original_shape)
+
+    def decompress_int_chunk(self, int_chunk: np.ndarray, scale: float) -> np.ndarray:
+        """
+        Flat variant of decompress_from_dense_int for a slice of the recovered integer
+        vector (streamed decryption): float values, no reshape.
+        """
+        return np.asarray(int_chunk).astype(float) * scale
 
     # ----------------------
     # Serialization helpers
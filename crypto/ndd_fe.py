@@ -3,24 +3,31 @@ HealChain NDD-FE + Chunked BSGS (High-performance version)
 
 FEATURES ADDED:
 ---------------
-1) Baby-step caching (massive speedup)
+1) Baby-step caching (massive speedup), compact 12-byte/step index persisted as memory-mapped tables
 2) Cached BSGS positive + negative fallback
 3) Chunked recovery wrapper (decrypt_aggregate_chunked)
 4) Optional parallel processing of chunks
 5) Robust modular consistency checks and Python big-int safety
-6) Backward compatibility with existing decrypt_aggregate()
+6) Jacobian-coordinate EC engine with batched normalization for the hot paths
+7) Backward compatibility with existing decrypt_aggregate()
 
 Dependencies:
     pip install tinyec numpy
 """
 
 import math
+import heapq
+import itertools
+import numbers
 import hashlib
 import os
-from typing import List, Tuple
+from typing import List, NamedTuple, Tuple, Union
 import numpy as np
 from tinyec import registry
-from concurrent.futures import ProcessPoolExecutor
+from tinyec.ec import Point as _TinyPoint, Inf as _TinyInf
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+from multiprocessing import shared_memory
 
 # =======================
 # Curve setup
@@ -28,6 +35,7 @@ from concurrent.futures import ProcessPoolExecutor
 curve = registry.get_curve('secp256r1')
 G = curve.g
 N = curve.field.n
+_P = curve.field.p
 
 # =======================
 # Utilities
@@ -44,8 +52,12 @@ def point_to_bytes(pt):
 
 
 def derive_ri_from_shared(shared_point, ctr: int, task_id: bytes) -> int:
+    return _derive_ri_from_encoded(point_to_bytes(shared_point), ctr, task_id)
+
+
+def _derive_ri_from_encoded(shared_bytes: bytes, ctr: int, task_id: bytes) -> int:
     payload = (
-        point_to_bytes(shared_point)
+        shared_bytes
         + int_to_bytes(ctr, 8)
         + int_to_bytes(len(task_id), 2)
         + task_id
@@ -77,6 +89,12 @@ def safe_scalar_mul(point, scalar):
     """
     if point is None or getattr(point, "x", None) is None or getattr(point, "y", None) is None:
         return None
+    if _use_jacobian():
+        # engine points stay engine points; tinyec in, tinyec out
+        result = ECPoint.from_point(point) * int(scalar)
+        if result.is_infinity():
+            return None
+        return result if isinstance(point, ECPoint) else result.to_tinyec()
     try:
         return point * int(scalar)
     except TypeError:
@@ -86,11 +104,632 @@ def safe_scalar_mul(point, scalar):
             return None
 
 
+def points_equal(a, b) -> bool:
+    """Compare two points by affine coordinates, across backends and infinity encodings."""
+    if is_infinity(a) or is_infinity(b):
+        return is_infinity(a) and is_infinity(b)
+    return int(a.x) == int(b.x) and int(a.y) == int(b.y)
+
+
+def _add_points(a, b):
+    """a + b treating None / any point-at-infinity representation as the identity (None)."""
+    if is_infinity(a):
+        return None if is_infinity(b) else b
+    if is_infinity(b):
+        return a
+    total = a + b
+    return None if is_infinity(total) else total
+
+
+def _batch_inverse(values: List[int], modulus: int) -> List[int]:
+    """
+    Montgomery's trick: invert every (non-zero) value with a single modular inversion.
+    """
+    n = len(values)
+    if n == 0:
+        return []
+    prefix = [0] * n
+    acc = 1
+    for i, v in enumerate(values):
+        prefix[i] = acc
+        acc = acc * v % modulus
+    inv = pow(acc, -1, modulus)
+    out = [0] * n
+    for i in range(n - 1, -1, -1):
+        out[i] = inv * prefix[i] % modulus
+        inv = inv * values[i] % modulus
+    return out
+
+
+# =======================
+# Jacobian EC engine
+# =======================
+# Internal secp256r1 arithmetic on plain integer tuples. A Jacobian point (X, Y, Z)
+# represents the affine point (X/Z^2, Y/Z^3); Z == 0 is the identity. Additions and
+# doublings need no modular inversion, and many points can be normalized back to
+# affine coordinates with one inversion (Montgomery's trick). Affine results are
+# identical to tinyec's, so ciphertexts stay bit-for-bit the same.
+#
+# Backend flag: "jacobian" (default) routes the hot paths in this module through the
+# engine, "tinyec" keeps the original tinyec affine arithmetic.
+# Select via HEALCHAIN_EC_BACKEND or set_ec_backend().
+_EC_BACKENDS = ("jacobian", "tinyec")
+EC_BACKEND = os.environ.get("HEALCHAIN_EC_BACKEND", "jacobian")
+if EC_BACKEND not in _EC_BACKENDS:
+    raise ValueError(f"HEALCHAIN_EC_BACKEND must be one of {_EC_BACKENDS}, got {EC_BACKEND!r}")
+
+# the doubling formula below uses the a = -3 shortcut of the NIST prime curves
+assert curve.a % _P == _P - 3, "Jacobian engine requires a curve with a = -3"
+
+_JAC_INF = (1, 1, 0)
+_SCALAR_WINDOW = 4
+
+
+def set_ec_backend(name: str):
+    """Select the point arithmetic backend ('jacobian' or 'tinyec')."""
+    global EC_BACKEND
+    if name not in _EC_BACKENDS:
+        raise ValueError(f"EC backend must be one of {_EC_BACKENDS}, got {name!r}")
+    EC_BACKEND = name
+
+
+def _use_jacobian() -> bool:
+    return EC_BACKEND == "jacobian"
+
+
+def _jac_double(P):
+    X1, Y1, Z1 = P
+    if Z1 == 0 or Y1 == 0:
+        return _JAC_INF
+    p = _P
+    YY = Y1 * Y1 % p
+    ZZ = Z1 * Z1 % p
+    S = 4 * X1 * YY % p
+    M = 3 * (X1 - ZZ) * (X1 + ZZ) % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YY * YY) % p
+    Z3 = 2 * Y1 * Z1 % p
+    return (X3, Y3, Z3)
+
+
+def _jac_add(P, Q):
+    X1, Y1, Z1 = P
+    X2, Y2, Z2 = Q
+    if Z1 == 0:
+        return Q
+    if Z2 == 0:
+        return P
+    p = _P
+    Z1Z1 = Z1 * Z1 % p
+    Z2Z2 = Z2 * Z2 % p
+    U1 = X1 * Z2Z2 % p
+    U2 = X2 * Z1Z1 % p
+    S1 = Y1 * Z2 * Z2Z2 % p
+    S2 = Y2 * Z1 * Z1Z1 % p
+    H = (U2 - U1) % p
+    R = (S2 - S1) % p
+    if H == 0:
+        return _jac_double(P) if R == 0 else _JAC_INF
+    HH = H * H % p
+    HHH = H * HH % p
+    V = U1 * HH % p
+    X3 = (R * R - HHH - 2 * V) % p
+    Y3 = (R * (V - X3) - S1 * HHH) % p
+    Z3 = Z1 * Z2 * H % p
+    return (X3, Y3, Z3)
+
+
+def _jac_add_affine(P, x2: int, y2: int):
+    """Mixed addition P + (x2, y2) with an affine (Z = 1) second operand."""
+    X1, Y1, Z1 = P
+    if Z1 == 0:
+        return (x2, y2, 1)
+    p = _P
+    Z1Z1 = Z1 * Z1 % p
+    U2 = x2 * Z1Z1 % p
+    S2 = y2 * Z1 * Z1Z1 % p
+    H = (U2 - X1) % p
+    R = (S2 - Y1) % p
+    if H == 0:
+        return _jac_double(P) if R == 0 else _JAC_INF
+    HH = H * H % p
+    HHH = H * HH % p
+    V = X1 * HH % p
+    X3 = (R * R - HHH - 2 * V) % p
+    Y3 = (R * (V - X3) - Y1 * HHH) % p
+    Z3 = Z1 * H % p
+    return (X3, Y3, Z3)
+
+
+def _jac_neg(P):
+    X, Y, Z = P
+    return (X, (-Y) % _P, Z)
+
+
+def _jac_to_affine(P):
+    X, Y, Z = P
+    if Z == 0:
+        return None
+    if Z == 1:
+        return (X, Y)
+    zinv = pow(Z, -1, _P)
+    zinv2 = zinv * zinv % _P
+    return (X * zinv2 % _P, Y * zinv2 * zinv % _P)
+
+
+def _jac_batch_to_affine(points):
+    """Normalize many Jacobian points with a single inversion; identity maps to None."""
+    finite = [i for i, P in enumerate(points) if P[2] != 0]
+    out = [None] * len(points)
+    invs = _batch_inverse([points[i][2] for i in finite], _P)
+    for i, zinv in zip(finite, invs):
+        X, Y, _ = points[i]
+        zinv2 = zinv * zinv % _P
+        out[i] = (X * zinv2 % _P, Y * zinv2 * zinv % _P)
+    return out
+
+
+def _jac_mul(P, k: int):
+    """k * P for a Jacobian P using a fixed 4-bit window over batch-normalized multiples."""
+    k %= N
+    if k == 0 or P[2] == 0:
+        return _JAC_INF
+    if k < (1 << _SCALAR_WINDOW):
+        acc = _JAC_INF
+        for _ in range(k):
+            acc = _jac_add(acc, P)
+        return acc
+    # odd and even multiples 1..15 of P, as affine points for cheap mixed additions
+    mults = [P]
+    for _ in range((1 << _SCALAR_WINDOW) - 2):
+        mults.append(_jac_add(mults[-1], P))
+    table = [None] + _jac_batch_to_affine(mults)
+
+    acc = _JAC_INF
+    shift = ((k.bit_length() + _SCALAR_WINDOW - 1) // _SCALAR_WINDOW) * _SCALAR_WINDOW
+    mask = (1 << _SCALAR_WINDOW) - 1
+    while shift > 0:
+        shift -= _SCALAR_WINDOW
+        if acc[2] != 0:
+            for _ in range(_SCALAR_WINDOW):
+                acc = _jac_double(acc)
+        digit = (k >> shift) & mask
+        if digit:
+            aff = table[digit]
+            if aff is not None:
+                acc = _jac_add_affine(acc, aff[0], aff[1])
+    return acc
+
+
+class ECPoint:
+    """
+    secp256r1 point in Jacobian coordinates with the same surface as tinyec's Point:
+    `+`, `-`, scalar `*`, equality and `.x` / `.y` (None for the point-at-infinity).
+    """
+
+    __slots__ = ("jac", "_aff")
+
+    def __init__(self, jac, affine=False):
+        self.jac = jac
+        # cached affine form: False = not computed yet, None = identity
+        self._aff = False
+        if affine:
+            self._aff = None if jac[2] == 0 else (jac[0], jac[1])
+
+    @classmethod
+    def infinity(cls) -> "ECPoint":
+        return cls(_JAC_INF, affine=True)
+
+    @classmethod
+    def from_affine(cls, x: int, y: int) -> "ECPoint":
+        return cls((int(x), int(y), 1), affine=True)
+
+    @classmethod
+    def from_point(cls, pt) -> "ECPoint":
+        """Convert a tinyec point (or None / Inf) into an engine point."""
+        if isinstance(pt, ECPoint):
+            return pt
+        if is_infinity(pt):
+            return cls.infinity()
+        return cls.from_affine(pt.x, pt.y)
+
+    @property
+    def affine(self):
+        if self._aff is False:
+            self._aff = _jac_to_affine(self.jac)
+        return self._aff
+
+    @property
+    def x(self):
+        aff = self.affine
+        return None if aff is None else aff[0]
+
+    @property
+    def y(self):
+        aff = self.affine
+        return None if aff is None else aff[1]
+
+    @property
+    def curve(self):
+        return curve
+
+    def is_infinity(self) -> bool:
+        return self.jac[2] == 0
+
+    def to_tinyec(self):
+        """Return the equivalent tinyec point (tinyec's Inf for the identity)."""
+        aff = self.affine
+        if aff is None:
+            return _TinyInf(curve)
+        return _TinyPoint(curve, aff[0], aff[1])
+
+    @staticmethod
+    def normalize_batch(points):
+        """Compute and cache affine coordinates of many points with one inversion."""
+        pending = [P for P in points if P is not None and P._aff is False]
+        for P, aff in zip(pending, _jac_batch_to_affine([P.jac for P in pending])):
+            P._aff = aff
+        return points
+
+    def __add__(self, other):
+        if other is None:
+            return self
+        if not isinstance(other, ECPoint):
+            if is_infinity(other):
+                return self
+            return ECPoint(_jac_add_affine(self.jac, int(other.x), int(other.y)))
+        if other._aff:
+            return ECPoint(_jac_add_affine(self.jac, other._aff[0], other._aff[1]))
+        return ECPoint(_jac_add(self.jac, other.jac))
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        P = ECPoint(_jac_neg(self.jac))
+        if self._aff is not False:
+            P._aff = None if self._aff is None else (self._aff[0], (-self._aff[1]) % _P)
+        return P
+
+    def __sub__(self, other):
+        return self + (-ECPoint.from_point(other))
+
+    def __mul__(self, k):
+        if not isinstance(k, int):
+            return NotImplemented
+        return ECPoint(_jac_mul(self.jac, k))
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if other is None or not hasattr(other, "x"):
+            return NotImplemented if other is not None else self.is_infinity()
+        if not isinstance(other, ECPoint):
+            other = ECPoint.from_point(other)
+        X1, Y1, Z1 = self.jac
+        X2, Y2, Z2 = other.jac
+        if Z1 == 0 or Z2 == 0:
+            return Z1 == 0 and Z2 == 0
+        p = _P
+        Z1Z1 = Z1 * Z1 % p
+        Z2Z2 = Z2 * Z2 % p
+        return (X1 * Z2Z2 - X2 * Z1Z1) % p == 0 and (Y1 * Z2Z2 * Z2 - Y2 * Z1Z1 * Z1) % p == 0
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self):
+        return hash(self.affine)
+
+    def __repr__(self):
+        return f"ECPoint{fmt_point(self)}"
+
+
+# =======================
+# Fixed-base tables
+# =======================
+# For bases that stay fixed for a whole task (G, pk_A, pk_TP) a table of
+# d * 2^(w*i) * P (all digits d of every w-bit window i, stored affine) turns each
+# scalar multiplication into ~256/w mixed additions with no doublings.
+_FIXED_BASE_MAGIC = b"HCFB"
+_FIXED_BASE_FORMAT_VERSION = 1
+_FIXED_BASE_WINDOW = 6
+_FIXED_BASE_CACHE_MAX = 64
+
+_FIXED_BASE_CACHE = {}
+
+
+class FixedBaseTable:
+    """
+    Windowed fixed-base table for k * P.
+
+    rows[i][d - 1] holds the affine point d * 2^(window*i) * P. Build once per
+    (task, base) through fixed_base_table() and reuse it across rounds.
+    """
+
+    def __init__(self, base, window: int = _FIXED_BASE_WINDOW, rows=None):
+        if not 1 <= window <= 16:
+            raise ValueError(f"window must be in [1, 16], got {window}")
+        self.window = int(window)
+        self.base = None if is_infinity(base) else (int(base.x), int(base.y))
+        self.num_windows = (N.bit_length() + self.window - 1) // self.window
+        self.rows = rows if rows is not None else self._build()
+
+    def _build(self):
+        if self.base is None:
+            return []
+        digits = (1 << self.window) - 1
+        jacs = []
+        start = (self.base[0], self.base[1], 1)
+        for _ in range(self.num_windows):
+            acc = start
+            for _ in range(digits):
+                jacs.append(acc)
+                acc = _jac_add(acc, start)
+            # acc is now 2^window * start: the first entry of the next window
+            start = acc
+        flat = _jac_batch_to_affine(jacs)
+        return [flat[i * digits:(i + 1) * digits] for i in range(self.num_windows)]
+
+    def mul_jac(self, k: int):
+        """k * P as a Jacobian tuple."""
+        k = int(k) % N
+        acc = _JAC_INF
+        if self.base is None:
+            return acc
+        mask = (1 << self.window) - 1
+        i = 0
+        while k:
+            d = k & mask
+            if d:
+                x, y = self.rows[i][d - 1]
+                acc = _jac_add_affine(acc, x, y)
+            k >>= self.window
+            i += 1
+        return acc
+
+    def mul(self, k: int) -> "ECPoint":
+        return ECPoint(self.mul_jac(k))
+
+    def to_bytes(self) -> bytes:
+        """Serialize as magic | version | window | base(64) | rows (64 bytes per entry)."""
+        out = [
+            _FIXED_BASE_MAGIC,
+            bytes([_FIXED_BASE_FORMAT_VERSION, self.window]),
+            b"\x00" * 64 if self.base is None else int_to_bytes(self.base[0]) + int_to_bytes(self.base[1]),
+        ]
+        for row in self.rows:
+            for x, y in row:
+                out.append(int_to_bytes(x) + int_to_bytes(y))
+        return b"".join(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "FixedBaseTable":
+        if data[:4] != _FIXED_BASE_MAGIC or data[4] != _FIXED_BASE_FORMAT_VERSION:
+            raise ValueError("Not a fixed-base table (bad magic or version)")
+        window = data[5]
+        bx = int.from_bytes(data[6:38], "big")
+        by = int.from_bytes(data[38:70], "big")
+        table = cls.__new__(cls)
+        table.window = window
+        table.base = None if (bx, by) == (0, 0) else (bx, by)
+        table.num_windows = (N.bit_length() + window - 1) // window
+        digits = (1 << window) - 1
+        expected = 70 + (0 if table.base is None else table.num_windows * digits * 64)
+        if len(data) != expected:
+            raise ValueError(f"Fixed-base table size mismatch: {len(data)} != {expected}")
+        entries = []
+        for off in range(70, len(data), 64):
+            entries.append((int.from_bytes(data[off:off + 32], "big"), int.from_bytes(data[off + 32:off + 64], "big")))
+        table.rows = [entries[i * digits:(i + 1) * digits] for i in range(table.num_windows)] if table.base else []
+        if table.rows and table.rows[0][0] != table.base:
+            raise ValueError("Fixed-base table is inconsistent with its base point")
+        return table
+
+
+def fixed_base_table(point, window: int = _FIXED_BASE_WINDOW) -> FixedBaseTable:
+    """Return the cached table for point, building it on first use."""
+    key = (None, None, window) if is_infinity(point) else (int(point.x), int(point.y), window)
+    table = _FIXED_BASE_CACHE.get(key)
+    if table is None:
+        if len(_FIXED_BASE_CACHE) >= _FIXED_BASE_CACHE_MAX:
+            # evict the oldest entry (dicts keep insertion order)
+            _FIXED_BASE_CACHE.pop(next(iter(_FIXED_BASE_CACHE)))
+        table = FixedBaseTable(point, window)
+        _FIXED_BASE_CACHE[key] = table
+    return table
+
+
+def clear_fixed_base_cache(points=None):
+    """Drop cached tables, e.g. at task end. points=None clears everything except G."""
+    if points is None:
+        for key in list(_FIXED_BASE_CACHE):
+            if key[:2] != (G.x, G.y):
+                del _FIXED_BASE_CACHE[key]
+        return
+    for pt in points:
+        if is_infinity(pt):
+            continue
+        for key in list(_FIXED_BASE_CACHE):
+            if key[:2] == (int(pt.x), int(pt.y)):
+                del _FIXED_BASE_CACHE[key]
+
+
+G_JAC = ECPoint.from_affine(G.x, G.y)
+
+
+# =======================
+# Multi-scalar multiplication
+# =======================
+# sum_i s_i * P_i without one full scalar multiplication per term. Straus shares
+# the doublings between all terms (good for few points); Pippenger's bucket method
+# also shares the additions and wins once there are more than a few hundred points.
+_MSM_STRAUS_MAX = 128
+_MSM_STRAUS_WINDOW = 4
+
+
+def _msm_straus(pts, scalars):
+    w = _MSM_STRAUS_WINDOW
+    mask = (1 << w) - 1
+    digits = min(mask, max(scalars))
+    jacs = []
+    for x, y in pts:
+        acc = (x, y, 1)
+        for _ in range(digits):
+            jacs.append(acc)
+            acc = _jac_add_affine(acc, x, y)
+    flat = _jac_batch_to_affine(jacs)
+    tables = [flat[i * digits:(i + 1) * digits] for i in range(len(pts))]
+
+    nbits = max(s.bit_length() for s in scalars)
+    shift = ((nbits + w - 1) // w) * w
+    acc = _JAC_INF
+    while shift > 0:
+        shift -= w
+        if acc[2] != 0:
+            for _ in range(w):
+                acc = _jac_double(acc)
+        for table, s in zip(tables, scalars):
+            d = (s >> shift) & mask
+            if d:
+                aff = table[d - 1]
+                if aff is not None:
+                    acc = _jac_add_affine(acc, aff[0], aff[1])
+    return acc
+
+
+def _msm_pippenger(pts, scalars):
+    c = max(2, len(pts).bit_length() - 2)
+    mask = (1 << c) - 1
+    nbits = max(s.bit_length() for s in scalars)
+    acc = _JAC_INF
+    for wi in reversed(range((nbits + c - 1) // c)):
+        if acc[2] != 0:
+            for _ in range(c):
+                acc = _jac_double(acc)
+        buckets = [_JAC_INF] * (mask + 1)
+        shift = wi * c
+        for (x, y), s in zip(pts, scalars):
+            d = (s >> shift) & mask
+            if d:
+                buckets[d] = _jac_add_affine(buckets[d], x, y)
+        # sum_d d * bucket[d] via running sums
+        running = _JAC_INF
+        total = _JAC_INF
+        for d in range(mask, 0, -1):
+            running = _jac_add(running, buckets[d])
+            total = _jac_add(total, running)
+        acc = _jac_add(acc, total)
+    return acc
+
+
+def multi_scalar_mul(points, scalars) -> "ECPoint":
+    """
+    sum_i scalars[i] * points[i] (mod N) as an ECPoint.
+    Points may be tinyec points, ECPoints or None (identity). Scalars above N/2 are
+    applied as -(N - s) * P so negative weights keep short scalars.
+    """
+    engine_pts = [ECPoint.from_point(P) for P in points]
+    ECPoint.normalize_batch(engine_pts)
+    pts = []
+    ks = []
+    for P, s in zip(engine_pts, scalars):
+        s = int(s) % N
+        aff = P.affine
+        if s == 0 or aff is None:
+            continue
+        if s > N // 2:
+            s = N - s
+            aff = (aff[0], (-aff[1]) % _P)
+        pts.append(aff)
+        ks.append(s)
+    if not pts:
+        return ECPoint.infinity()
+    if len(pts) <= _MSM_STRAUS_MAX:
+        return ECPoint(_msm_straus(pts, ks))
+    return ECPoint(_msm_pippenger(pts, ks))
+
+
+def _base_mul(k: int):
+    """k * G in the active backend (tinyec Point or ECPoint)."""
+    return fixed_base_table(G).mul(k) if _use_jacobian() else int(k) * G
+
+
+def _iter_multiples_affine(base, count: int, block: int = 4096):
+    """
+    Yield affine (x, y) of j*base for j = 1..count (None for the identity).
+    The engine path accumulates Jacobian points and normalizes them per block.
+    """
+    if not _use_jacobian():
+        Pj = base
+        for _ in range(count):
+            yield None if is_infinity(Pj) else (int(Pj.x), int(Pj.y))
+            Pj = Pj + base
+        return
+
+    bx, by = int(base.x), int(base.y)
+    acc = (bx, by, 1)
+    pending = []
+    for _ in range(count):
+        pending.append(acc)
+        if len(pending) == block:
+            yield from _jac_batch_to_affine(pending)
+            pending = []
+        acc = _jac_add_affine(acc, bx, by)
+    if pending:
+        yield from _jac_batch_to_affine(pending)
+
+
+# =======================
+# ECDH shared-secret cache
+# =======================
+# sk * pk only depends on the key pair, not on ctr, so it is identical in every round
+# of a task. Entries hold the encoded shared point, keyed by (own sk, peer pk), and
+# are dropped with evict_shared_secrets() when the task ends (FIFO beyond the cap).
+_SHARED_SECRET_CACHE = {}
+_SHARED_SECRET_CACHE_MAX = 1 << 16
+
+
+def ecdh_shared_secret(sk: int, pk: object) -> bytes:
+    """Encoded shared point sk * pk (cached per key pair)."""
+    key = (int(sk), int(pk.x), int(pk.y))
+    shared = _SHARED_SECRET_CACHE.get(key)
+    if shared is None:
+        shared = point_to_bytes(safe_scalar_mul(pk, sk))
+        _cache_shared_secret(key, shared)
+    return shared
+
+
+def _cache_shared_secret(key, shared: bytes):
+    if len(_SHARED_SECRET_CACHE) >= _SHARED_SECRET_CACHE_MAX:
+        _SHARED_SECRET_CACHE.pop(next(iter(_SHARED_SECRET_CACHE)))
+    _SHARED_SECRET_CACHE[key] = shared
+
+
+def evict_shared_secrets(sk: int = None, pks=None):
+    """
+    Drop cached shared secrets at task end: all entries of own key sk (only those
+    with the given peer keys if pks is set), or the whole cache when sk is None.
+    """
+    if sk is None:
+        _SHARED_SECRET_CACHE.clear()
+        return
+    sk = int(sk)
+    if pks is not None:
+        for pk in pks:
+            _SHARED_SECRET_CACHE.pop((sk, int(pk.x), int(pk.y)), None)
+        return
+    for key in [key for key in _SHARED_SECRET_CACHE if key[0] == sk]:
+        del _SHARED_SECRET_CACHE[key]
+
+
 # =======================
 # KeyGen + KeyDerive
 # =======================
 def key_gen() -> Tuple[object, int]:
     sk = int.from_bytes(os.urandom(32), "big") % (N - 1) + 1
+    if _use_jacobian():
+        return fixed_base_table(G).mul(sk).to_tinyec(), sk
     return sk * G, sk
 
 
@@ -99,30 +738,524 @@ def key_derive(sk_TP: int, pk_miners: List[object], weights_y: List[float],
 
     sk_FE = 0
     for pk_i, w in zip(pk_miners, weights_y):
-        shared = pk_i * sk_TP
-        r_i = derive_ri_from_shared(shared, ctr, task_id)
+        r_i = _derive_ri_from_encoded(ecdh_shared_secret(sk_TP, pk_i), ctr, task_id)
         w_scaled = int(round(w * scale_weights)) % N
         sk_FE = (sk_FE + r_i * w_scaled) % N
 
     return sk_FE
 
 
+# below this many missing secrets a process pool costs more than it saves
+_KEY_DERIVE_PARALLEL_MIN = 64
+
+
+def _ecdh_chunk_worker(backend: str, sk: int, pk_xys) -> List[bytes]:
+    set_ec_backend(backend)
+    return [point_to_bytes(safe_scalar_mul(_TinyPoint(curve, x, y), sk)) for x, y in pk_xys]
+
+
+def key_derive_many(sk_TP: int, pk_miners: List[object], weights_y: List[float],
+                    ctr: int, task_id: bytes, scale_weights: int = 1,
+                    shared_secrets: List[object] = None, max_workers: int = None) -> int:
+    """
+    key_derive for large cohorts: same sk_FE, with the ECDH work fanned out.
+
+    shared_secrets: optional list aligned with pk_miners holding precomputed
+    sk_TP * pk_i (points or their point_to_bytes encoding; None where unknown).
+    Secrets that are neither given nor cached are computed on a process pool
+    (max_workers processes, default all cores) once there are enough of them,
+    and cached for the following rounds. sum(r_i * w_scaled) is reduced mod N
+    at the end.
+    """
+    encoded = [None] * len(pk_miners)
+    missing = []
+    for i, pk_i in enumerate(pk_miners):
+        given = None if shared_secrets is None else shared_secrets[i]
+        if given is not None:
+            encoded[i] = given if isinstance(given, bytes) else point_to_bytes(given)
+            continue
+        encoded[i] = _SHARED_SECRET_CACHE.get((int(sk_TP), int(pk_i.x), int(pk_i.y)))
+        if encoded[i] is None:
+            missing.append(i)
+
+    if len(missing) >= _KEY_DERIVE_PARALLEL_MIN and max_workers != 1:
+        workers = max_workers or os.cpu_count() or 1
+        per_task = -(-len(missing) // (4 * workers))
+        batches = [missing[s:s + per_task] for s in range(0, len(missing), per_task)]
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = [ex.submit(_ecdh_chunk_worker, EC_BACKEND, sk_TP,
+                                 [(int(pk_miners[i].x), int(pk_miners[i].y)) for i in batch])
+                       for batch in batches]
+            for batch, fut in zip(batches, futures):
+                for i, shared in zip(batch, fut.result()):
+                    encoded[i] = shared
+                    _cache_shared_secret((int(sk_TP), int(pk_miners[i].x), int(pk_miners[i].y)), shared)
+    else:
+        for i in missing:
+            encoded[i] = ecdh_shared_secret(sk_TP, pk_miners[i])
+
+    total = 0
+    for shared, w in zip(encoded, weights_y):
+        total += _derive_ri_from_encoded(shared, ctr, task_id) * (int(round(w * scale_weights)) % N)
+    return total % N
+
+
 # =======================
 # Encryption (miner-side)
 # =======================
+def _to_tinyec_affine(aff):
+    return _TinyInf(curve) if aff is None else _TinyPoint(curve, aff[0], aff[1])
+
+
+def _small_value_ciphertexts(mask, pk_A, max_int: int) -> list:
+    """
+    Ciphertexts mask + v*pk_A for every v in [-max_int, max_int], indexed by v + max_int.
+    mask is a Jacobian tuple (engine backend) or a tinyec point.
+    """
+    multiples = list(_iter_multiples_affine(pk_A, max_int))  # v*pk_A for v = 1..max_int
+    if _use_jacobian():
+        jacs = [mask]
+        for aff in multiples:
+            if aff is None:
+                jacs += [mask, mask]
+            else:
+                jacs.append(_jac_add_affine(mask, aff[0], aff[1]))
+                jacs.append(_jac_add_affine(mask, aff[0], (-aff[1]) % _P))
+        affs = _jac_batch_to_affine(jacs)
+        zero = _to_tinyec_affine(affs[0])
+        pos = [_to_tinyec_affine(a) for a in affs[1::2]]
+        neg = [_to_tinyec_affine(a) for a in affs[2::2]]
+    else:
+        zero = mask
+        pos = [mask if aff is None else mask + _TinyPoint(curve, aff[0], aff[1]) for aff in multiples]
+        neg = [mask if aff is None else mask + _TinyPoint(curve, aff[0], (-aff[1]) % _P) for aff in multiples]
+    return neg[::-1] + [zero] + pos
+
+
+def _miner_mask(sk_miner: int, pk_TP: object, ctr: int, task_id: bytes):
+    """mask = r_i * pk_TP as a Jacobian tuple (engine backend) or a tinyec point."""
+    r_i = _derive_ri_from_encoded(ecdh_shared_secret(sk_miner, pk_TP), ctr, task_id)
+    if _use_jacobian():
+        # pk_TP is fixed for the whole task: use its (cached) fixed-base table
+        return fixed_base_table(pk_TP).mul_jac(r_i)
+    return pk_TP * r_i
+
+
+class EncryptionMask:
+    """
+    Encryption material for one (miner key, pk_TP, pk_A, ctr, task_id): the mask
+    r_i*pk_TP and, with max_int, the small-value ciphertext table. None of it
+    depends on the update, so miners can build it while training runs.
+    """
+
+    __slots__ = ("key", "mask", "table")
+
+    def __init__(self, key: tuple, mask, table: list = None):
+        self.key = key
+        self.mask = mask
+        self.table = table
+
+
+def _mask_key(sk_miner: int, pk_TP: object, pk_A: object, ctr: int, task_id: bytes, max_int: int = None) -> tuple:
+    return (EC_BACKEND, int(sk_miner), int(pk_TP.x), int(pk_TP.y), int(pk_A.x), int(pk_A.y),
+            int(ctr), bytes(task_id), None if max_int is None else int(max_int))
+
+
+def prepare_encryption_mask(sk_miner: int, pk_TP: object, pk_A: object, ctr: int, task_id: bytes,
+                            max_int: int = None) -> EncryptionMask:
+    """Precompute the mask (and small-value table) for a later encrypt_integer_vector call."""
+    mask = _miner_mask(sk_miner, pk_TP, ctr, task_id)
+    table = None if max_int is None else _small_value_ciphertexts(mask, pk_A, int(max_int))
+    return EncryptionMask(_mask_key(sk_miner, pk_TP, pk_A, ctr, task_id, max_int), mask, table)
+
+
+def _encrypt_values(mask, pk_A: object, values: np.ndarray, max_int: int = None, table: list = None,
+                    compact: str = None):
+    """
+    mask + x*pk_A for every x in values: a list of tinyec points, or a
+    CiphertextVector when compact is "compressed" or "affine".
+    """
+    if compact is not None and compact not in _COMPACT_FORMATS:
+        raise ValueError(f"compact must be one of {_COMPACT_FORMATS}, got {compact!r}")
+    compressed = compact == "compressed"
+
+    if _use_jacobian():
+        a_table = fixed_base_table(pk_A)
+
+        def encrypt_affine(vals):
+            return _jac_batch_to_affine([_jac_add(mask, a_table.mul_jac(int(x) % N)) for x in vals])
+    else:
+        def encrypt_affine(vals):
+            pts = [mask + (int(x) % N) * pk_A for x in vals]
+            return [None if is_infinity(pt) else (int(pt.x), int(pt.y)) for pt in pts]
+
+    def encrypt_block(vals):
+        affs = encrypt_affine(vals)
+        if compact is not None:
+            return _encode_affine_rows(affs, compressed)
+        return [_to_tinyec_affine(aff) for aff in affs]
+
+    if max_int is not None:
+        max_int = int(max_int)
+        if table is None:
+            table = _small_value_ciphertexts(mask, pk_A, max_int)
+        idx = values.astype(np.int64) + max_int
+        in_range = (idx >= 0) & (idx <= 2 * max_int)
+        outliers = np.nonzero(~in_range)[0]
+        if compact is not None:
+            # encode the 2*max_int+1 table rows once, then gather
+            rows = CiphertextVector.from_points(table, compressed=compressed).buf[np.where(in_range, idx, max_int)]
+            if outliers.size:
+                rows[outliers] = encrypt_block(values[outliers])
+            return CiphertextVector(rows)
+        ciphertexts = [table[i] for i in np.where(in_range, idx, max_int).tolist()]
+        if outliers.size:
+            for pos, ct in zip(outliers.tolist(), encrypt_block(values[outliers])):
+                ciphertexts[pos] = ct
+        return ciphertexts
+
+    # normalize per block: one inversion per block instead of one per addition
+    blocks = [encrypt_block(values[start:start + 1024]) for start in range(0, len(values), 1024)]
+    if compact is not None:
+        width = 33 if compressed else 64
+        return CiphertextVector(np.concatenate(blocks) if blocks else np.zeros((0, width), dtype=np.uint8))
+    return [ct for block in blocks for ct in block]
+
+
 def encrypt_integer_vector(sk_miner: int, pk_TP: object, pk_A: object,
-                           int_delta: np.ndarray, ctr: int, task_id: bytes):
+                           int_delta: np.ndarray, ctr: int, task_id: bytes,
+                           max_int: int = None, sparse: bool = False,
+                           prepared: EncryptionMask = None, compact: str = None):
+    """
+    U_i[k] = r_i*pk_TP + x_k*pk_A for every element of int_delta.
+
+    max_int: optional bound on |x_k| (DGC's quantization range). When given, the
+    ciphertexts of every value in [-max_int, max_int] are precomputed once and each
+    element becomes a table lookup; all zeros share the same mask point object.
+    Values outside the range fall back to a direct computation.
+
+    sparse: return a SparseCiphertext (mask + ciphertexts of the non-zero entries only)
+    instead of a dense list. Zero entries are implied by the shared mask point.
+
+    prepared: material from prepare_encryption_mask(); used only if it was built
+    for exactly these inputs, otherwise the mask is computed here.
+
+    compact: "compressed" (33 bytes per point) or "affine" (64 bytes) stores the
+    ciphertexts in a CiphertextVector instead of a list of Point objects.
+    """
+    if prepared is not None and prepared.key == _mask_key(sk_miner, pk_TP, pk_A, ctr, task_id, max_int):
+        mask, table = prepared.mask, prepared.table
+    else:
+        mask, table = _miner_mask(sk_miner, pk_TP, ctr, task_id), None
+    values = np.asarray(int_delta).flatten()
+
+    if sparse:
+        nz = np.flatnonzero(values)
+        mask_point = _to_tinyec_affine(_jac_to_affine(mask)) if _use_jacobian() else mask
+        return SparseCiphertext(len(values), mask_point, nz,
+                                _encrypt_values(mask, pk_A, values[nz], max_int, table, compact))
+
+    return _encrypt_values(mask, pk_A, values, max_int, table, compact)
+
+
+class SparseCiphertext:
+    """
+    Sparse U_i: one mask point plus (index, ciphertext) pairs for the non-zero entries.
+
+    Behaves like the dense list for len(), integer indexing (zeros resolve to the mask)
+    and contiguous slicing, so it can be passed anywhere a dense U_i is accepted.
+    """
+
+    __slots__ = ("length", "mask", "indices", "points")
+
+    def __init__(self, length: int, mask, indices, points):
+        self.length = int(length)
+        self.mask = mask
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.points = points if isinstance(points, CiphertextVector) else list(points)
+        if self.indices.shape[0] != len(self.points):
+            raise ValueError("SparseCiphertext indices and points must have the same length")
+
+    @property
+    def nnz(self) -> int:
+        return len(self.points)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            start, stop, step = k.indices(self.length)
+            if step != 1:
+                raise ValueError("SparseCiphertext only supports contiguous slices")
+            stop = max(start, stop)
+            lo = int(np.searchsorted(self.indices, start, side="left"))
+            hi = int(np.searchsorted(self.indices, stop, side="left"))
+            return SparseCiphertext(stop - start, self.mask, self.indices[lo:hi] - start, self.points[lo:hi])
+        k = int(k)
+        if k < 0:
+            k += self.length
+        if not 0 <= k < self.length:
+            raise IndexError("SparseCiphertext index out of range")
+        pos = int(np.searchsorted(self.indices, k))
+        if pos < len(self.points) and self.indices[pos] == k:
+            return self.points[pos]
+        return self.mask
+
+    def __iter__(self):
+        return iter(self.to_dense())
+
+    def to_dense(self) -> list:
+        dense = [self.mask] * self.length
+        for k, pt in zip(self.indices.tolist(), self.points):
+            dense[k] = pt
+        return dense
+
+    def take(self, positions: np.ndarray) -> "SparseCiphertext":
+        """Entries at the given sorted positions, as a SparseCiphertext of len(positions)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        keep = np.nonzero(np.isin(self.indices, positions))[0]
+        new_idx = np.searchsorted(positions, self.indices[keep])
+        if isinstance(self.points, CiphertextVector):
+            points = self.points.take(keep)
+        else:
+            points = [self.points[i] for i in keep.tolist()]
+        return SparseCiphertext(len(positions), self.mask, new_idx, points)
+
+
+# =======================
+# Compact ciphertext storage
+# =======================
+# SEC1 compressed points (0x02/0x03 || x, 33 bytes) or raw affine x || y (64 bytes),
+# one row per ciphertext in a contiguous uint8 array. The identity is an all-zero row.
+_COMPACT_FORMATS = ("compressed", "affine")
+assert _P % 4 == 3, "point decompression uses the p = 3 (mod 4) square root"
+_SQRT_EXP = (_P + 1) // 4
+
+
+def _decompress_y(x: int, parity: int) -> int:
+    y = pow((x * x * x + curve.a * x + curve.b) % _P, _SQRT_EXP, _P)
+    if y * y % _P != (x * x * x + curve.a * x + curve.b) % _P:
+        raise ValueError("compressed point is not on the curve")
+    return y if (y & 1) == parity else _P - y
+
+
+def _encode_affine_rows(affs, compressed: bool) -> np.ndarray:
+    """uint8 rows for affine (x, y) tuples (None for the identity)."""
+    width = 33 if compressed else 64
+    zero = b"\x00" * width
+    if compressed:
+        rows = [zero if a is None else bytes((2 | (a[1] & 1),)) + a[0].to_bytes(32, "big") for a in affs]
+    else:
+        rows = [zero if a is None else a[0].to_bytes(32, "big") + a[1].to_bytes(32, "big") for a in affs]
+    return np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(len(rows), width)
+
 
-    shared = pk_TP * sk_miner
-    r_i = derive_ri_from_shared(shared, ctr, task_id)
-    mask = pk_TP * r_i
+class CiphertextVector:
+    """
+    U_i in one contiguous NumPy byte buffer: 33-byte compressed or 64-byte affine rows.
+
+    Behaves like the dense point list for len(), indexing (points are decoded on
+    access), iteration and slicing; slices are views of the same buffer. The buffer
+    can be exported to SharedMemory so worker processes map it without copying.
+    """
+
+    __slots__ = ("buf", "_shm")
+
+    def __init__(self, buf: np.ndarray):
+        buf = np.asarray(buf, dtype=np.uint8)
+        if buf.ndim != 2 or buf.shape[1] not in (33, 64):
+            raise ValueError("CiphertextVector buffer must have shape (n, 33) or (n, 64)")
+        self.buf = buf
+        # SharedMemory block backing buf when attached from another process
+        self._shm = None
+
+    @classmethod
+    def from_points(cls, points, compressed: bool = True) -> "CiphertextVector":
+        affs = []
+        for pt in points:
+            aff = pt.affine if isinstance(pt, ECPoint) else (None if is_infinity(pt) else (int(pt.x), int(pt.y)))
+            affs.append(aff)
+        return cls(_encode_affine_rows(affs, compressed))
+
+    @property
+    def compressed(self) -> bool:
+        return self.buf.shape[1] == 33
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.buf.nbytes)
+
+    def __len__(self):
+        return int(self.buf.shape[0])
+
+    def affine(self, k: int):
+        """Affine (x, y) of element k, or None for the identity."""
+        row = self.buf[k].tobytes()
+        if self.compressed:
+            if row[0] == 0:
+                return None
+            x = int.from_bytes(row[1:], "big")
+            return x, _decompress_y(x, row[0] & 1)
+        if not any(row):
+            return None
+        return int.from_bytes(row[:32], "big"), int.from_bytes(row[32:], "big")
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return CiphertextVector(self.buf[k])
+        return _to_tinyec_affine(self.affine(int(k)))
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def take(self, positions) -> "CiphertextVector":
+        """Rows at the given positions (a copy, like NumPy fancy indexing)."""
+        return CiphertextVector(self.buf[np.asarray(positions, dtype=np.int64)])
+
+    def to_points(self) -> list:
+        return list(self)
+
+    def __reduce__(self):
+        return (CiphertextVector, (np.array(self.buf),))
+
+    def to_shared_memory(self):
+        """Copy the buffer into a new SharedMemory block; the caller owns (and unlinks) it."""
+        shm = shared_memory.SharedMemory(create=True, size=max(1, self.nbytes))
+        np.ndarray(self.buf.shape, dtype=np.uint8, buffer=shm.buf)[:] = self.buf
+        return shm
+
+    @classmethod
+    def attach_shared_memory(cls, name: str, length: int, compressed: bool) -> "CiphertextVector":
+        """Zero-copy view of a vector exported with to_shared_memory()."""
+        shm = shared_memory.SharedMemory(name=name)
+        vec = cls(np.ndarray((length, 33 if compressed else 64), dtype=np.uint8, buffer=shm.buf))
+        vec._shm = shm
+        return vec
+
+
+# =======================
+# Streaming wire format
+# =======================
+# header:  magic "HCCT" | version u8 | flags u8 (bit 0: sparse) | task_id length u16 |
+#          task_id | ctr u64 | length u64 | nnz u64 | mask (33 bytes, sparse only)
+# frames:  row count u32 | indices u64 * count (sparse only) | compressed points 33 * count
+# All integers are little-endian. Frames are written as the vector is encoded and
+# can be decoded one by one, so a reader can start on the first rows early.
+_WIRE_MAGIC = b"HCCT"
+_WIRE_VERSION = 1
+_WIRE_FLAG_SPARSE = 1
+_WIRE_FRAME_ROWS = 4096
+
+
+class CiphertextHeader(NamedTuple):
+    task_id: bytes
+    ctr: int
+    length: int
+    sparse: bool
+    nnz: int
+    mask: object = None  # sparse only
+
+
+def _read_exact(fp, n: int) -> bytes:
+    """Read exactly n bytes (file-like objects may return short reads)."""
+    chunks = []
+    while n > 0:
+        chunk = fp.read(n)
+        if not chunk:
+            raise ValueError("truncated ciphertext stream")
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+def _compressed_rows(points) -> np.ndarray:
+    if isinstance(points, CiphertextVector) and points.compressed:
+        return points.buf
+    return CiphertextVector.from_points(points, compressed=True).buf
+
+
+def write_ciphertext_stream(fp, U_i, task_id: bytes, ctr: int, frame_rows: int = _WIRE_FRAME_ROWS) -> int:
+    """
+    Serialize U_i (point list, CiphertextVector or SparseCiphertext) to fp with
+    compressed points, encoding and writing one frame at a time. Returns bytes written.
+    """
+    sparse = isinstance(U_i, SparseCiphertext)
+    rows_total = U_i.nnz if sparse else len(U_i)
+    task_id = bytes(task_id)
+    header = (
+        _WIRE_MAGIC
+        + bytes((_WIRE_VERSION, _WIRE_FLAG_SPARSE if sparse else 0))
+        + len(task_id).to_bytes(2, "little")
+        + task_id
+        + int(ctr).to_bytes(8, "little")
+        + len(U_i).to_bytes(8, "little")
+        + rows_total.to_bytes(8, "little")
+    )
+    if sparse:
+        header += _compressed_rows([U_i.mask]).tobytes()
+    fp.write(header)
+    written = len(header)
+
+    points = U_i.points if sparse else U_i
+    for start in range(0, rows_total, frame_rows):
+        stop = min(rows_total, start + frame_rows)
+        frame = (stop - start).to_bytes(4, "little")
+        if sparse:
+            frame += np.ascontiguousarray(U_i.indices[start:stop], dtype="<u8").tobytes()
+        frame += _compressed_rows(points[start:stop]).tobytes()
+        fp.write(frame)
+        written += len(frame)
+    return written
+
+
+def read_ciphertext_header(fp) -> CiphertextHeader:
+    fixed = _read_exact(fp, 8)
+    if fixed[:4] != _WIRE_MAGIC:
+        raise ValueError("not a ciphertext stream")
+    if fixed[4] != _WIRE_VERSION:
+        raise ValueError(f"unsupported ciphertext stream version {fixed[4]}")
+    sparse = bool(fixed[5] & _WIRE_FLAG_SPARSE)
+    task_id = _read_exact(fp, int.from_bytes(fixed[6:8], "little"))
+    rest = _read_exact(fp, 24)
+    ctr = int.from_bytes(rest[:8], "little")
+    length = int.from_bytes(rest[8:16], "little")
+    nnz = int.from_bytes(rest[16:24], "little")
+    mask = None
+    if sparse:
+        mask = CiphertextVector(np.frombuffer(_read_exact(fp, 33), dtype=np.uint8).reshape(1, 33))[0]
+    return CiphertextHeader(task_id, ctr, length, sparse, nnz, mask)
+
+
+def iter_ciphertext_frames(fp, header: CiphertextHeader):
+    """
+    Yield the frames following header as they arrive: (indices, CiphertextVector).
+    indices are the positions of the rows in U_i (consecutive for dense streams).
+    """
+    pos = 0
+    while pos < header.nnz:
+        count = int.from_bytes(_read_exact(fp, 4), "little")
+        if count == 0 or pos + count > header.nnz:
+            raise ValueError("corrupt ciphertext stream frame")
+        if header.sparse:
+            indices = np.frombuffer(_read_exact(fp, 8 * count), dtype="<u8").astype(np.int64)
+        else:
+            indices = np.arange(pos, pos + count, dtype=np.int64)
+        rows = np.frombuffer(_read_exact(fp, 33 * count), dtype=np.uint8).reshape(count, 33)
+        pos += count
+        yield indices, CiphertextVector(rows)
 
-    ciphertexts = []
-    for x in np.asarray(int_delta).flatten():
-        clipped = int(x) % N
-        ciphertexts.append(mask + clipped * pk_A)
 
-    return ciphertexts
+def read_ciphertext_stream(fp) -> Tuple[CiphertextHeader, object]:
+    """Read a whole stream: (header, CiphertextVector or SparseCiphertext)."""
+    header = read_ciphertext_header(fp)
+    frames = list(iter_ciphertext_frames(fp, header))
+    rows = np.concatenate([v.buf for _, v in frames]) if frames else np.zeros((0, 33), dtype=np.uint8)
+    if not header.sparse:
+        return header, CiphertextVector(rows)
+    indices = np.concatenate([i for i, _ in frames]) if frames else np.zeros(0, dtype=np.int64)
+    return header, SparseCiphertext(header.length, header.mask, indices, CiphertextVector(rows))
 
 
 # =====================================================================================
@@ -146,24 +1279,250 @@ def _point_key(pt):
     return (int(x), int(y) & 1)
 
 
+# -------------------------------------------------------------------------------------
+# Compact baby-step index (optionally persisted)
+# -------------------------------------------------------------------------------------
+# Each baby step j*G is stored as a 64-bit fingerprint of its x-coordinate (uint64)
+# plus a parallel uint32 holding (j << 1) | (y & 1): 12 bytes per step instead of a
+# ~150-byte dict entry. Fingerprint collisions are rare and are confirmed with a full
+# point check before a candidate is accepted.
+#
+# Layout of a table file (all integers little-endian):
+#   header (64 bytes): magic(8) | format version u32 | m u64 | count u64 | curve digest(32) | pad
+#   keys:  count * u64, x-fingerprints of j*G sorted ascending
+#   js:    count * u32, (j << 1) | (y & 1) aligned with keys
+# Files are named by m and content version so stale or foreign tables are never reused.
+_TABLE_MAGIC = b"HCBSGS\x00\x00"
+_TABLE_FORMAT_VERSION = 2
+_TABLE_HEADER_SIZE = 64
+_FINGERPRINT_MASK = (1 << 64) - 1
+# j is packed next to the parity bit in a uint32
+_TABLE_MAX_M = 1 << 31
+# tables smaller than this are cheaper to rebuild than to read back from disk
+_TABLE_PERSIST_MIN_M = 1 << 10
+
+
+_CURVE_DIGEST = None
+
+
+def _curve_digest() -> bytes:
+    """Digest of the curve parameters a table was built against."""
+    global _CURVE_DIGEST
+    if _CURVE_DIGEST is not None:
+        return _CURVE_DIGEST
+    payload = b"|".join([
+        str(curve.name).encode("utf-8"),
+        int_to_bytes(curve.field.p), int_to_bytes(curve.a % curve.field.p),
+        int_to_bytes(curve.b % curve.field.p), int_to_bytes(N),
+        int_to_bytes(G.x), int_to_bytes(G.y),
+    ])
+    _CURVE_DIGEST = hashlib.sha256(payload).digest()
+    return _CURVE_DIGEST
+
+
+def _table_cache_dir():
+    """
+    Directory for persisted baby-step tables.
+    HEALCHAIN_BSGS_CACHE_DIR overrides the default; an empty value disables persistence.
+    """
+    d = os.environ.get("HEALCHAIN_BSGS_CACHE_DIR")
+    if d is None:
+        d = os.path.join(os.path.expanduser("~"), ".cache", "healchain", "bsgs")
+    return d or None
+
+
+def _table_path(m: int):
+    d = _table_cache_dir()
+    if d is None:
+        return None
+    return os.path.join(d, f"baby_{curve.name}_m{m}_v{_TABLE_FORMAT_VERSION}_{_curve_digest().hex()[:16]}.bin")
+
+
+def x_fingerprint(x: int) -> int:
+    """64-bit fingerprint of an x-coordinate (its low 64 bits)."""
+    return int(x) & _FINGERPRINT_MASK
+
+
+class BabyStepTable:
+    """
+    Sorted baby-step index {j*G : j in [1, m)} searched with np.searchsorted.
+
+    Keys are fixed-width fingerprints so the arrays can be memory-mapped straight
+    from disk and shared (read-only, via the page cache) by every process on the host.
+    """
+
+    def __init__(self, m: int, keys: np.ndarray, js: np.ndarray, path: str = None):
+        self.m = int(m)
+        self.keys = keys
+        self.js = js
+        self.path = path
+        # SharedMemory block backing keys/js when attached from another process
+        self._shm = None
+
+    def __len__(self):
+        return int(self.keys.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.keys.nbytes + self.js.nbytes)
+
+    @classmethod
+    def build(cls, m: int) -> "BabyStepTable":
+        """Compute j*G for j in [1, m) by repeated addition and sort by fingerprint."""
+        if m > _TABLE_MAX_M:
+            raise ValueError(f"Baby-step table size m={m} exceeds {_TABLE_MAX_M}")
+        count = max(0, m - 1)
+        raw_keys = np.empty(count, dtype=np.uint64)
+        raw_js = np.empty(count, dtype=np.uint32)
+        for j, (x, y) in enumerate(_iter_multiples_affine(G, count), start=1):
+            raw_keys[j - 1] = x & _FINGERPRINT_MASK
+            raw_js[j - 1] = (j << 1) | (y & 1)
+        order = np.argsort(raw_keys, kind="stable")
+        return cls(m, raw_keys[order], raw_js[order])
+
+    def save(self, path: str):
+        """Write the table atomically (tmp file + rename) so readers never see a partial file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        header = (
+            _TABLE_MAGIC
+            + _TABLE_FORMAT_VERSION.to_bytes(4, "little")
+            + self.m.to_bytes(8, "little")
+            + len(self).to_bytes(8, "little")
+            + _curve_digest()
+        )
+        header = header.ljust(_TABLE_HEADER_SIZE, b"\x00")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(np.ascontiguousarray(self.keys, dtype="<u8").tobytes())
+            f.write(np.ascontiguousarray(self.js, dtype="<u4").tobytes())
+        os.replace(tmp, path)
+        self.path = path
+
+    @classmethod
+    def open(cls, path: str, m: int):
+        """Memory-map a persisted table. Returns None if missing, stale or corrupt."""
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_TABLE_HEADER_SIZE)
+            if len(header) != _TABLE_HEADER_SIZE or header[:8] != _TABLE_MAGIC:
+                return None
+            version = int.from_bytes(header[8:12], "little")
+            file_m = int.from_bytes(header[12:20], "little")
+            count = int.from_bytes(header[20:28], "little")
+            if version != _TABLE_FORMAT_VERSION or file_m != m or header[28:60] != _curve_digest():
+                return None
+            expected_size = _TABLE_HEADER_SIZE + count * (8 + 4)
+            if os.path.getsize(path) != expected_size or count != max(0, m - 1):
+                return None
+            keys = np.memmap(path, dtype="<u8", mode="r",
+                             offset=_TABLE_HEADER_SIZE, shape=(count,))
+            js = np.memmap(path, dtype="<u4", mode="r",
+                           offset=_TABLE_HEADER_SIZE + count * 8, shape=(count,))
+            return cls(m, keys, js, path=path)
+        except (OSError, ValueError):
+            return None
+
+    def to_shared_memory(self):
+        """Copy the table into a new SharedMemory block; the caller owns (and unlinks) it."""
+        shm = shared_memory.SharedMemory(create=True, size=max(1, self.nbytes))
+        count = len(self)
+        np.ndarray((count,), dtype="<u8", buffer=shm.buf)[:] = self.keys
+        np.ndarray((count,), dtype="<u4", buffer=shm.buf, offset=count * 8)[:] = self.js
+        return shm
+
+    @classmethod
+    def attach_shared_memory(cls, name: str, m: int, count: int) -> "BabyStepTable":
+        """Zero-copy view of a table exported with to_shared_memory()."""
+        # pool workers share the exporting process' resource tracker, which unlinks
+        # the block only when the owner does
+        shm = shared_memory.SharedMemory(name=name)
+        keys = np.ndarray((count,), dtype="<u8", buffer=shm.buf)
+        js = np.ndarray((count,), dtype="<u4", buffer=shm.buf, offset=count * 8)
+        table = cls(m, keys, js)
+        table._shm = shm
+        return table
+
+    def lookup_many_signed(self, fingerprints: np.ndarray, parities: np.ndarray) -> np.ndarray:
+        """
+        x-only probe: j*G and -j*G share an x-coordinate, so each hit resolves a sign.
+        Returns +j (point == j*G), -j (point == -j*G) or 0 for a miss.
+        """
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        out = np.zeros(fingerprints.shape, dtype=np.int64)
+        if len(self) == 0 or fingerprints.size == 0:
+            return out
+        idx = np.searchsorted(self.keys, fingerprints)
+        idx_c = np.minimum(idx, len(self) - 1)
+        v = self.js[idx_c].astype(np.int64)
+        hit = self.keys[idx_c] == fingerprints
+        sign = np.where((v & 1) == np.asarray(parities, dtype=np.int64), 1, -1)
+        out[hit] = (sign * (v >> 1))[hit]
+        return out
+
+    def signed_candidates(self, fingerprint: int, parity: int) -> List[int]:
+        """
+        Every signed j whose entry shares this fingerprint (lookup_many_signed only
+        reports the first one): callers retry these when that one fails its point check.
+        """
+        fp = np.uint64(int(fingerprint) & _FINGERPRINT_MASK)
+        lo = int(np.searchsorted(self.keys, fp, side="left"))
+        hi = int(np.searchsorted(self.keys, fp, side="right"))
+        return [(int(v) >> 1) if (int(v) & 1) == parity else -(int(v) >> 1) for v in self.js[lo:hi]]
+
+    def lookup(self, pt) -> int:
+        """Return j such that j*G == pt, or -1 if pt is not in the table."""
+        key = _point_key(pt)
+        if key == (None, None):
+            return 0
+        if len(self) == 0:
+            return -1
+        fp = np.uint64(key[0] & _FINGERPRINT_MASK)
+        lo = int(np.searchsorted(self.keys, fp, side="left"))
+        hi = int(np.searchsorted(self.keys, fp, side="right"))
+        candidates = [int(v) >> 1 for v in self.js[lo:hi] if (int(v) & 1) == key[1]]
+        if len(candidates) == 1:
+            return candidates[0]
+        # fingerprint collision inside the table: confirm with the full point
+        for j in candidates:
+            if points_equal(_base_mul(j), pt):
+                return j
+        return -1
+
+
+def _load_or_build_table(m: int) -> BabyStepTable:
+    """Open the persisted table for m, building and persisting it on a miss."""
+    path = _table_path(m) if m >= _TABLE_PERSIST_MIN_M else None
+    if path is not None:
+        table = BabyStepTable.open(path, m)
+        if table is not None:
+            return table
+
+    table = BabyStepTable.build(m)
+    if path is not None:
+        try:
+            table.save(path)
+        except OSError:
+            pass  # read-only cache dir: keep the in-memory table
+    return table
+
+
 def _precompute_babysteps(bound: int):
     """
-    Precompute baby steps once for given bound and cache by m = ceil(sqrt(bound))
+    Load (or build once) the baby-step table for given bound and cache by m = ceil(sqrt(bound)).
+    An already cached larger table is reused as is: it only means fewer giant steps.
     """
     m = int(math.ceil(math.sqrt(bound)))
     if m in _BABY_CACHE:
         return _BABY_CACHE[m], m
+    larger = [mm for mm in _BABY_CACHE if mm > m]
+    if larger:
+        mm = min(larger)
+        return _BABY_CACHE[mm], mm
 
-    baby = {}
-    baby[(None, None)] = 0
-
-    # compute j * G deterministically
-    for j in range(1, m):
-        Pj = j * G
-        baby[_point_key(Pj)] = j
-
-    _BABY_CACHE[m] = baby
-    return baby, m
+    table = _load_or_build_table(m)
+    _BABY_CACHE[m] = table
+    return table, m
 
 
 def bsgs_cached(pt, bound: int):
@@ -176,24 +1535,17 @@ def bsgs_cached(pt, bound: int):
 
     baby, m = _precompute_babysteps(bound)
     # compute -m*G safely
-    neg_mG = safe_scalar_mul(G, (-m) % N)
-    if neg_mG is None:
-        neg_mG = ((-m) % N) * G
-
-    current = pt
-    for i in range(m):
-        if is_infinity(current):
-            key = (None, None)
-        else:
-            key = _point_key(current)
+    neg_mG = _base_mul((-m) % N)
 
-        if key in baby:
-            j = baby[key]
+    current = ECPoint.from_point(pt) if _use_jacobian() else pt
+    for i in range(-(-bound // m)):
+        j = baby.lookup(current)
+        if j >= 0:
             candidate = i * m + j
             if candidate < bound:
                 # final verification
                 try:
-                    if candidate * G == pt:
+                    if points_equal(_base_mul(candidate), pt):
                         return candidate
                 except Exception:
                     return -1
@@ -207,6 +1559,829 @@ def bsgs_cached(pt, bound: int):
     return -1
 
 
+def bsgs_signed_batch(points: List[object], bound: int) -> List[object]:
+    """
+    Signed multi-target BSGS: solve x_k*G == points[k] with |x_k| < bound in one walk.
+
+    Baby steps are matched on x only, so a table of j*G (1 <= j < m) covers the
+    centered window c-(m-1) .. c+(m-1) around every giant-step position c and the
+    giant stride is s = 2m-1. Each target gets two walkers moving away from zero,
+    so small magnitudes of either sign resolve after a few steps and the worst case
+    is bound/m steps per target, instead of a positive walk followed by a second
+    full walk on the negated point.
+    Returns a list with x_k or None per target.
+    """
+    results = [None] * len(points)
+    covered = [(0, -1)] * len(points)
+    _signed_walk(points, bound, covered, results)
+    return results
+
+
+def _signed_walk(points: List[object], bound: int, covered: list, results: list, walk: tuple = None):
+    """
+    Resumable core of bsgs_signed_batch.
+
+    covered[k] = (lo, hi) is the range already searched for target k ((0, -1) when
+    nothing was); the walk only visits windows outside it, up to |x| < bound, and
+    updates covered and results (None = unresolved) in place. The range may have
+    been covered with a different table size: walkers restart at the edges.
+    walk: (baby, m, stride, sx, sy) from DecryptPlan.walk(bound), built here if None.
+    """
+    if walk is None:
+        baby, m = _precompute_babysteps(bound)
+        stride = 2 * m - 1
+        sx, sy = _jac_to_affine(fixed_base_table(G).mul_jac(stride))
+    else:
+        baby, m, stride, sx, sy = walk
+    step_y = {1: (-sy) % _P, -1: sy}  # +walker adds -s*G, -walker adds +s*G
+    limit = bound - 1
+
+    # walkers as parallel lists; walker t sits at points[k] - centers[t]*G,
+    # x=None marks the point-at-infinity
+    idxs, dirs, centers, xs, ys = [], [], [], [], []
+    for k, pt in enumerate(points):
+        if results[k] is not None:
+            continue
+        if is_infinity(pt):
+            results[k] = 0
+            continue
+        px, py = int(pt.x), int(pt.y)
+        lo, hi = covered[k]
+        for d, c in ((1, hi + m), (-1, lo - m)):
+            if abs(c) - (m - 1) > limit:
+                continue
+            aff = _jac_to_affine(_jac_add_affine(fixed_base_table(G).mul_jac((-c) % N), px, py))
+            idxs.append(k)
+            dirs.append(d)
+            centers.append(c)
+            xs.append(None if aff is None else aff[0])
+            ys.append(None if aff is None else aff[1])
+
+    while idxs:
+        finite = [t for t, x in enumerate(xs) if x is not None]
+        js = np.zeros(len(idxs), dtype=np.int64)
+        hits = np.array([x is None for x in xs], dtype=bool)
+        if finite:
+            fps = np.array([x_fingerprint(xs[t]) for t in finite], dtype=np.uint64)
+            par = np.array([ys[t] & 1 for t in finite], dtype=np.int64)
+            js[finite] = baby.lookup_many_signed(fps, par)
+            hits[finite] = js[finite] != 0
+
+        for t in np.nonzero(hits)[0]:
+            k = idxs[t]
+            if results[k] is not None:
+                continue
+            first = int(js[t])
+            offsets = (first,)
+            if xs[t] is not None:
+                # later entries of a colliding fingerprint run, checked only if the first fails
+                offsets = itertools.chain(offsets, (j for j in baby.signed_candidates(x_fingerprint(xs[t]), ys[t] & 1)
+                                                    if j != first))
+            for j in offsets:
+                candidate = centers[t] + j
+                # final verification (also rejects fingerprint collisions)
+                if abs(candidate) <= limit and points_equal(_base_mul(candidate % N), points[k]):
+                    results[k] = candidate
+                    break
+
+        # record the searched windows, then drop solved and exhausted walkers
+        keep = []
+        for t, k in enumerate(idxs):
+            lo, hi = covered[k]
+            if dirs[t] == 1:
+                hi = min(centers[t] + m - 1, limit)
+            else:
+                lo = max(centers[t] - (m - 1), -limit)
+            covered[k] = (lo, hi)
+            centers[t] += dirs[t] * stride
+            if results[k] is None and abs(centers[t]) - (m - 1) <= limit:
+                keep.append(t)
+        if len(keep) != len(idxs):
+            idxs = [idxs[t] for t in keep]
+            dirs = [dirs[t] for t in keep]
+            centers = [centers[t] for t in keep]
+            xs = [xs[t] for t in keep]
+            ys = [ys[t] for t in keep]
+        if not idxs:
+            break
+
+        # giant step: move every walker one stride further from zero
+        special = [t for t, x in enumerate(xs) if x is None or x == sx]
+        gen = [t for t, x in enumerate(xs) if x is not None and x != sx]
+        invs = _batch_inverse([(sx - xs[t]) % _P for t in gen], _P)
+        for t, inv in zip(gen, invs):
+            x1, y1 = xs[t], ys[t]
+            qy = step_y[dirs[t]]
+            lam = (qy - y1) * inv % _P
+            x3 = (lam * lam - x1 - sx) % _P
+            ys[t] = (lam * (x1 - x3) - y1) % _P
+            xs[t] = x3
+        for t in special:
+            qy = step_y[dirs[t]]
+            if xs[t] is None:
+                xs[t], ys[t] = sx, qy
+                continue
+            aff = _jac_to_affine(_jac_add_affine((xs[t], ys[t], 1), sx, qy))
+            xs[t], ys[t] = (None, None) if aff is None else aff
+
+
+# =====================================================================================
+#                    DIRECT SMALL-VALUE LOOKUP (|S| <= T)
+# =====================================================================================
+# With tau=0.9 sparsity most aggregates are 0 or tiny, so a table of j*G for
+# j in [1, T] (a BabyStepTable with m = T+1, probed x-only for the sign) resolves
+# them with one lookup each before any BSGS table for the full bound is touched.
+# Select T via HEALCHAIN_DIRECT_DLOG_BOUND or set_direct_dlog_bound(); 0 disables.
+DIRECT_DLOG_BOUND = int(os.environ.get("HEALCHAIN_DIRECT_DLOG_BOUND", 1 << 16))
+_DIRECT_TABLES = {}
+
+
+def set_direct_dlog_bound(bound: int):
+    """Set T for the direct lookup table (0 disables the direct probe)."""
+    global DIRECT_DLOG_BOUND
+    if int(bound) < 0:
+        raise ValueError(f"direct dlog bound must be >= 0, got {bound}")
+    DIRECT_DLOG_BOUND = int(bound)
+
+
+def _direct_table(T: int) -> BabyStepTable:
+    table = _DIRECT_TABLES.get(T)
+    if table is None:
+        table = _load_or_build_table(T + 1)
+        _DIRECT_TABLES[T] = table
+    return table
+
+
+def direct_dlog_batch(points: List[object], T: int = None) -> List[object]:
+    """
+    Solve x_k*G == points[k] for |x_k| <= T by direct table lookup.
+    Returns a list with x_k or None (|x_k| > T) per target; T defaults to DIRECT_DLOG_BOUND.
+    """
+    T = DIRECT_DLOG_BOUND if T is None else int(T)
+    results = [None] * len(points)
+    finite = []
+    for k, pt in enumerate(points):
+        if is_infinity(pt):
+            results[k] = 0
+        else:
+            finite.append(k)
+    if T <= 0 or not finite:
+        return results
+
+    fps = np.array([x_fingerprint(int(points[k].x)) for k in finite], dtype=np.uint64)
+    par = np.array([int(points[k].y) & 1 for k in finite], dtype=np.int64)
+    table = _direct_table(T)
+    js = table.lookup_many_signed(fps, par)
+    for k, fp, p, j in zip(finite, fps.tolist(), par.tolist(), js.tolist()):
+        if j == 0:
+            continue
+        # confirm the 64-bit fingerprint match with the full point, then any
+        # further entries sharing the fingerprint
+        for cand in itertools.chain((j,), (c for c in table.signed_candidates(fp, p) if c != j)):
+            if points_equal(_base_mul(cand % N), points[k]):
+                results[k] = cand
+                break
+    return results
+
+
+# =====================================================================================
+#                    POLLARD KANGAROO (lambda) — LOW-MEMORY DLOG
+# =====================================================================================
+# Alternative to BSGS for large bounds: memory is the distinguished-point table only
+# (a few entries per kangaroo) instead of a sqrt(bound) baby table, and nothing has to
+# be rebuilt when the bound grows. Expected cost is ~2*sqrt(bound) additions per target.
+_DLOG_SOLVERS = ("bsgs", "kangaroo")
+_KANGAROO_HERD = 8
+_KANGAROO_DP_TARGET = 16  # distinguished points per kangaroo over an expected walk
+# below this bound a walk is shorter than the Manager round-trips of a shared
+# distinguished-point table, so such targets are solved in-process
+_KANGAROO_PARALLEL_MIN_BOUND = 1 << 26
+
+
+def _kangaroo_params(bound: int, herd: int):
+    """Jump exponents (jumps are 2^i * G) and the distinguished-point mask."""
+    beta = max(1.0, herd * math.sqrt(bound) / 4.0)  # optimal mean jump size
+    k = 1
+    while ((1 << k) - 1) / k < beta:
+        k += 1
+    walk = math.sqrt(bound) / max(1, herd)
+    dp_bits = max(0, int(math.log2(max(1.0, walk / _KANGAROO_DP_TARGET))))
+    return k, (1 << dp_bits) - 1
+
+
+def _kangaroo_walk(target_xy, bound: int, herd: int, seed: int, max_steps: int,
+                   dp_table, should_stop=None) -> int:
+    """
+    Walk a herd of tame and wild kangaroos with batched affine additions.
+
+    dp_table maps x-fingerprint -> (is_tame, distance) and may be shared between
+    processes (e.g. a Manager dict); should_stop is polled whenever a distinguished
+    point is stored. Returns x with x*G == target in [0, bound), or -1.
+    """
+    rng = np.random.default_rng(seed)
+    k, dp_mask = _kangaroo_params(bound, herd)
+    jumps = [1 << i for i in range(k)]
+    jump_pts = [_jac_to_affine(fixed_base_table(G).mul_jac(s)) for s in jumps]
+    tx, ty = target_xy
+    n_tame = max(1, herd // 2)
+
+    def spawn(tame: bool):
+        # tame: known position in the upper half; wild: target + small known offset
+        if tame:
+            d = bound // 2 + int(rng.integers(0, max(1, bound // 2)))
+            aff = _jac_to_affine(fixed_base_table(G).mul_jac(d))
+        else:
+            d = int(rng.integers(0, max(1, bound // 2)))
+            aff = _jac_to_affine(_jac_add_affine(fixed_base_table(G).mul_jac(d), tx, ty))
+        return aff, d
+
+    tame = [t < n_tame for t in range(herd)]
+    xs, ys, dist = [], [], []
+    for t in range(herd):
+        aff, d = spawn(tame[t])
+        while aff is None:
+            aff, d = spawn(tame[t])
+        xs.append(aff[0])
+        ys.append(aff[1])
+        dist.append(d)
+
+    for _ in range(max_steps):
+        # distinguished points
+        for t in range(herd):
+            fp = x_fingerprint(xs[t])
+            if (fp >> 32) & dp_mask:
+                continue
+            hit = dp_table.get(fp)
+            if hit is None:
+                dp_table[fp] = (tame[t], dist[t])
+            elif hit[0] != tame[t]:
+                tame_d, wild_d = (dist[t], hit[1]) if tame[t] else (hit[1], dist[t])
+                x = tame_d - wild_d
+                if 0 <= x < bound and points_equal(fixed_base_table(G).mul(x), ECPoint.from_affine(tx, ty)):
+                    return x
+            if hit is not None:
+                # merged with another kangaroo (or false match): restart this one
+                aff, d = spawn(tame[t])
+                while aff is None:
+                    aff, d = spawn(tame[t])
+                xs[t], ys[t], dist[t] = aff[0], aff[1], d
+            if should_stop is not None and should_stop():
+                return -1
+
+        # one jump for every kangaroo, sharing a single inversion
+        sel = [xs[t] % k for t in range(herd)]
+        gen = [t for t in range(herd) if xs[t] != jump_pts[sel[t]][0]]
+        invs = _batch_inverse([(jump_pts[sel[t]][0] - xs[t]) % _P for t in gen], _P)
+        for t, inv in zip(gen, invs):
+            qx, qy = jump_pts[sel[t]]
+            x1, y1 = xs[t], ys[t]
+            lam = (qy - y1) * inv % _P
+            x3 = (lam * lam - x1 - qx) % _P
+            ys[t] = (lam * (x1 - x3) - y1) % _P
+            xs[t] = x3
+        if len(gen) != herd:
+            for t in set(range(herd)) - set(gen):
+                # doubling or P + (-P): rare, done with the general formulas
+                qx, qy = jump_pts[sel[t]]
+                aff = _jac_to_affine(_jac_add_affine((xs[t], ys[t], 1), qx, qy))
+                if aff is None:
+                    aff, dist[t] = spawn(tame[t])
+                    while aff is None:
+                        aff, dist[t] = spawn(tame[t])
+                    sel[t] = None
+                xs[t], ys[t] = aff
+        for t in range(herd):
+            if sel[t] is not None:
+                dist[t] += jumps[sel[t]]
+    return -1
+
+
+def kangaroo_solve(pt, bound: int, herd: int = _KANGAROO_HERD, processes: int = 1,
+                   seed: int = None, max_steps: int = None) -> int:
+    """
+    Pollard-lambda discrete log: x in [0, bound) with x*G == pt, or -1.
+
+    Runs in memory independent of bound (only the distinguished-point table).
+    processes > 1 runs one herd per process; the herds share a single
+    distinguished-point table through a multiprocessing Manager.
+    The search is probabilistic: -1 after max_steps (default ~8x the expected
+    walk length) means "not found", not a proof that no solution exists.
+    """
+    return kangaroo_solve_many([pt], [bound], herd, processes, seed, max_steps)[0]
+
+
+def kangaroo_solve_many(points: List[object], bounds: List[int], herd: int = _KANGAROO_HERD,
+                        processes: int = 1, seed: int = None, max_steps: int = None) -> List[int]:
+    """
+    kangaroo_solve for several targets (points[k] over [0, bounds[k])).
+    With processes > 1 one Manager and one process pool serve every target with
+    bound >= _KANGAROO_PARALLEL_MIN_BOUND (smaller ones are solved in-process), so
+    the pool start-up is paid once per call rather than once per target.
+    """
+    herd = max(2, int(herd))
+    if seed is None:
+        seed = int.from_bytes(os.urandom(8), "big")
+    results = [-1] * len(points)
+    pending = []
+    for k, (pt, bound) in enumerate(zip(points, bounds)):
+        if is_infinity(pt):
+            results[k] = 0
+        elif int(bound) > 1:
+            pending.append(k)
+    if not pending:
+        return results
+
+    def steps_for(bound):
+        if max_steps is not None:
+            return max_steps
+        _, dp_mask = _kangaroo_params(bound, herd)
+        return int(16 * math.sqrt(bound) / herd) + 64 * (dp_mask + 1)
+
+    pooled = [k for k in pending if processes > 1 and int(bounds[k]) >= _KANGAROO_PARALLEL_MIN_BOUND]
+    for k in pending:
+        if processes <= 1 or int(bounds[k]) < _KANGAROO_PARALLEL_MIN_BOUND:
+            bound = int(bounds[k])
+            results[k] = _kangaroo_walk((int(points[k].x), int(points[k].y)), bound, herd,
+                                        seed + k * max(1, processes), steps_for(bound), {})
+    if not pooled:
+        return results
+
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=processes) as ex:
+        # every target's herds are queued at once, each target with its own
+        # distinguished-point table and stop event
+        owner = {}
+        stops = {}
+        for k in pooled:
+            bound = int(bounds[k])
+            target = (int(points[k].x), int(points[k].y))
+            dp_table = manager.dict()
+            stops[k] = manager.Event()
+            for i in range(processes):
+                fut = ex.submit(_kangaroo_worker, EC_BACKEND, target, bound, herd,
+                                seed + k * processes + i, steps_for(bound), dp_table, stops[k])
+                owner[fut] = k
+        for fut in as_completed(owner):
+            k = owner[fut]
+            x = fut.result()
+            if x >= 0 and results[k] < 0:
+                results[k] = x
+                # the target's other herds stop at their next distinguished point (or
+                # right away if still queued)
+                stops[k].set()
+    return results
+
+
+def _kangaroo_worker(backend: str, target_xy, bound: int, herd: int, seed: int,
+                     max_steps: int, dp_table, stop) -> int:
+    if stop.is_set():
+        # a sibling herd already solved this target while this one was queued
+        return -1
+    set_ec_backend(backend)
+    return _kangaroo_walk(target_xy, bound, herd, seed, max_steps, dp_table, should_stop=stop.is_set)
+
+
+def weighted_update_sums(weights_scaled: List[int], miner_int_updates: List[np.ndarray],
+                         chunk_starts: List[int] = None):
+    """
+    Signed plaintext aggregate S_k = sum_i w_i * upd_i[k] for every index, plus the
+    per-chunk maxima of |S_k| (chunks start at chunk_starts; one chunk if None).
+    Returns (S, chunk_max): S is int64 when sum_i |w_i| * max|upd_i| fits, else an
+    object array of Python ints; chunk_max is a list of Python ints.
+    One (miners x params) matrix product instead of a Python loop per index.
+    """
+    rows = [np.asarray(upd) for upd in miner_int_updates]
+    weights = [int(w) for w in weights_scaled]
+    # magnitude bound of every partial sum decides whether int64 is exact
+    magnitude = 0
+    for w, row in zip(weights, rows):
+        if row.size:
+            # Python ints: np.abs wraps INT64_MIN to a negative value
+            magnitude += abs(w) * max(abs(int(row.min())), abs(int(row.max())))
+    if magnitude < (1 << 63):
+        updates = np.stack([row.astype(np.int64) for row in rows])
+        S = np.asarray(weights, dtype=np.int64) @ updates
+    else:
+        updates = np.stack([np.array([int(x) for x in row.tolist()], dtype=object) for row in rows])
+        S = np.asarray(weights, dtype=object).dot(updates)
+    return S, _chunk_abs_max(S, [0] if chunk_starts is None else chunk_starts)
+
+
+def _chunk_abs_max(S: np.ndarray, chunk_starts: List[int]) -> List[int]:
+    """max |S_k| over each chunk (chunks start at chunk_starts), as Python ints."""
+    if S.size == 0:
+        return [0] * len(chunk_starts)
+    return [int(v) for v in np.maximum.reduceat(np.abs(S), list(chunk_starts))]
+
+
+def _plan_weight_groups(weight_scaled_mod: List[int]) -> List[Tuple[int, List[int]]]:
+    """Group miner positions by identical scaled weight, in order of first appearance."""
+    groups = {}
+    for i, w_mod in enumerate(weight_scaled_mod):
+        groups.setdefault(w_mod, []).append(i)
+    return list(groups.items())
+
+
+def _weighted_sum(points, scalars):
+    """sum_i scalars[i] * points[i] in the active backend; None for the identity."""
+    if _use_jacobian():
+        total = multi_scalar_mul(points, scalars)
+        return None if total.is_infinity() else total
+    total = None
+    for pt, w in zip(points, scalars):
+        total = _add_points(total, safe_scalar_mul(pt, w))
+    return total
+
+
+class DecryptPlan:
+    """
+    Invariants of a decrypt, built once per (sk_FE, sk_A, pk_TP, weights, scale_weights)
+    and shared by the one-shot, chunked, parallel and retry paths.
+
+    Unmasking and the 1/sk_A factor are folded into the scalars:
+    E*_k = sum_i (w_i/sk_A) * U_ik - (sk_FE/sk_A) * pk_TP, so each parameter costs
+    the weighted sum plus one point addition. Baby table and giant-step point are
+    kept per bound (walk()).
+    """
+
+    def __init__(self, sk_FE: int, sk_A: int, pk_TP: object, weights_y: List[float], scale_weights: int = 1):
+        self.key = self._key(sk_FE, sk_A, pk_TP, weights_y, scale_weights)
+        # signed scaled weights (Python ints)
+        self.weight_scaled_raw = [int(round(w * scale_weights)) for w in weights_y]
+        # also keep mod-N scalars for EC multiplication
+        self.weight_scaled_mod = [ws % N for ws in self.weight_scaled_raw]
+        self.inv_sk_A = pow(sk_A, -1, N)
+        self.weight_star = [w * self.inv_sk_A % N for w in self.weight_scaled_mod]
+        neg_global_scalar = (-sk_FE * self.inv_sk_A) % N
+        if _use_jacobian():
+            neg_global = fixed_base_table(pk_TP).mul(neg_global_scalar)
+            self.neg_global_star = None if neg_global.is_infinity() else neg_global
+        else:
+            self.neg_global_star = safe_scalar_mul(pk_TP, neg_global_scalar)
+        # miners with identical scaled weights are summed before one scalar multiplication
+        self.groups = _plan_weight_groups(self.weight_star)
+        self._walks = {}
+
+    @staticmethod
+    def _key(sk_FE, sk_A, pk_TP, weights_y, scale_weights) -> tuple:
+        return (EC_BACKEND, int(sk_FE), int(sk_A), int(pk_TP.x), int(pk_TP.y),
+                tuple(float(w) for w in weights_y), int(scale_weights))
+
+    def matches(self, sk_FE, sk_A, pk_TP, weights_y, scale_weights) -> bool:
+        return self.key == self._key(sk_FE, sk_A, pk_TP, weights_y, scale_weights)
+
+    def walk(self, bound: int) -> tuple:
+        """(baby table, m, giant stride, stride x, stride y) for the signed walk up to bound."""
+        walk = self._walks.get(bound)
+        if walk is None:
+            baby, m = _precompute_babysteps(bound)
+            stride = 2 * m - 1
+            sx, sy = _jac_to_affine(fixed_base_table(G).mul_jac(stride))
+            walk = self._walks[bound] = (baby, m, stride, sx, sy)
+        return walk
+
+
+def _check_index_set(ix, length: int, i: int) -> np.ndarray:
+    """Miner i's submitted indices as a flat int64 array; ValueError unless integers in [0, length)."""
+    arr = np.asarray(ix).ravel()
+    if arr.size == 0:
+        return arr.astype(np.int64)
+    if not np.issubdtype(arr.dtype, np.integer):
+        raise ValueError(f"index set of miner {i} must hold integers, got dtype {arr.dtype}")
+    if arr.min() < 0 or arr.max() >= length:
+        raise ValueError(f"index set of miner {i} has indices outside [0, {length})")
+    return arr.astype(np.int64)
+
+
+def _take_ciphertexts(miner_cts, positions: np.ndarray):
+    """U_i restricted to the given sorted positions (same container kind where possible)."""
+    if isinstance(miner_cts, (SparseCiphertext, CiphertextVector)):
+        return miner_cts.take(positions)
+    return [miner_cts[k] for k in positions.tolist()]
+
+
+def _mask_only_point(miner_cts, rest: np.ndarray):
+    """
+    The single point U_i holds at every position in rest (its mask, i.e. an
+    encryption of 0), or None if the entries there are not all identical.
+    """
+    if isinstance(miner_cts, SparseCiphertext):
+        return None if np.isin(miner_cts.indices, rest).any() else miner_cts.mask
+    if isinstance(miner_cts, CiphertextVector):
+        rows = miner_cts.buf[rest]
+        return miner_cts[int(rest[0])] if (rows == rows[0]).all() else None
+    first = miner_cts[int(rest[0])]
+    fx, fy = first.x, first.y
+    for k in rest.tolist():
+        pt = miner_cts[k]
+        if pt is not first and (pt.x != fx or pt.y != fy):
+            return None
+    return first
+
+
+def _verify_mask_only(plan: DecryptPlan, ciphertexts_U, rest: np.ndarray):
+    """
+    Bulk check that no miner encrypted anything at the positions in rest: each U_i
+    repeats one point m_i there, and sum(w_i * m_i) equals the global mask
+    sk_FE * pk_TP, so every such aggregate is 0 (one weighted sum for all of rest).
+    """
+    masks = []
+    for i, miner_cts in enumerate(ciphertexts_U):
+        m_i = _mask_only_point(miner_cts, rest)
+        if m_i is None:
+            raise ValueError(f"Mask-only verification failed: miner {i} has non-mask entries outside the index union")
+        masks.append(ECPoint.from_point(m_i) if _use_jacobian() else m_i)
+    # scaled by 1/sk_A on both sides: sum((w_i/sk_A) * m_i) - (sk_FE/sk_A) * pk_TP == O
+    if _add_points(_weighted_sum(masks, plan.weight_star), plan.neg_global_star) is not None:
+        raise ValueError("Mask-only verification failed: masks outside the index union do not cancel")
+
+
+# Consistency check of E*_k against the miners' plaintext updates, when those are
+# known (simulation / audit runs). Policies for verify=:
+#   "off"       no check
+#   "full"      E*_k == S_k * G for every parameter (one base multiplication each)
+#   "sample"    the same for verify_samples parameters drawn at random
+#   "aggregate" sum_k r_k * E*_k == (sum_k r_k * S_k) * G with fresh random 64-bit r_k:
+#               one multi-scalar multiplication for the whole vector, and a wrong
+#               E*_k passes only with probability ~2^-64. A mismatch reruns the full
+#               check so the error names the parameter.
+_VERIFY_MODES = ("off", "full", "sample", "aggregate")
+_VERIFY_SAMPLES = 32
+
+
+def _check_verify_mode(verify: str):
+    if verify not in _VERIFY_MODES:
+        raise ValueError(f"unknown verify mode {verify!r}; expected one of {_VERIFY_MODES}")
+
+
+def _verify_param(plan: DecryptPlan, E_star, miner_int_updates, k: int):
+    """Full consistency check of one parameter; raises ValueError on mismatch."""
+    # Miners encrypt clipped = int(x) % N, so we must use the same modular arithmetic
+    try:
+        # Compute S_mod using clipped modular values (same as miner encryption)
+        S_mod = 0
+        for w_mod, upd in zip(plan.weight_scaled_mod, miner_int_updates):
+            clipped = int(upd[k]) % N  # Same encoding miners use
+            S_mod = (S_mod + (w_mod * clipped)) % N
+
+        expected_point = _base_mul(S_mod)
+
+        # treat any representation of infinity as equal
+        equal = points_equal(E_star, expected_point)
+    except Exception:
+        # Non-critical exception in diagnostic should not block
+        return
+
+    if not equal:
+        print(f"[ERROR] Modular consistency failed at param {k}")
+        print(f"  S_mod (sum w_mod*clipped mod N) = {S_mod}")
+        print(f"  expected_point = {fmt_point(expected_point)}")
+        print(f"  E_star         = {fmt_point(E_star)}")
+        raise ValueError(f"Encrypted point mismatch for param {k}: check miner ciphertexts / pk_A / pk_TP / sk_FE / scale_weights.")
+
+
+def _verify_E_stars(plan: DecryptPlan, E_stars: list, miner_int_updates: List[np.ndarray],
+                    verify: str = "full", verify_samples: int = _VERIFY_SAMPLES, S: np.ndarray = None):
+    """
+    Apply the verify policy to recovered E* points; raises ValueError on mismatch.
+    S: the signed aggregate weighted_update_sums() gives for these updates, if known.
+    """
+    num_params = len(E_stars)
+    if verify == "off" or num_params == 0:
+        return
+    if verify == "aggregate":
+        try:
+            r = [int(x) for x in np.frombuffer(os.urandom(8 * num_params), dtype=np.uint64)]
+            if S is None:
+                S, _ = weighted_update_sums(plan.weight_scaled_raw, miner_int_updates)
+            # the signed S_k is congruent to the clipped encoding miners use, so one
+            # reduction of sum_k r_k * S_k is enough
+            S_mod = sum(rk * int(s) for rk, s in zip(r, S.tolist())) % N
+            equal = points_equal(_weighted_sum(E_stars, r), _base_mul(S_mod))
+        except Exception:
+            # Non-critical exception in diagnostic should not block
+            return
+        if equal:
+            return
+        for k in range(num_params):
+            _verify_param(plan, E_stars[k], miner_int_updates, k)
+        raise ValueError("Encrypted aggregate mismatch: check miner ciphertexts / pk_A / pk_TP / sk_FE / scale_weights.")
+    if verify == "sample" and verify_samples < num_params:
+        rng = np.random.default_rng(int.from_bytes(os.urandom(8), "big"))
+        indices = np.sort(rng.choice(num_params, size=max(0, verify_samples), replace=False)).tolist()
+    else:
+        indices = range(num_params)
+    for k in indices:
+        _verify_param(plan, E_stars[k], miner_int_updates, k)
+
+
+def _recover_E_stars(plan: DecryptPlan, ciphertexts_U: List[List[object]],
+                     miner_int_updates: List[np.ndarray] = None,
+                     verify: str = "full", verify_samples: int = _VERIFY_SAMPLES):
+    """
+    Aggregate, unmask and strip pk_A: E*_k = S_k * G for every parameter.
+    Returns (E_stars, dynamic_bounds); dynamic_bounds[k] is None unless it could be
+    derived from miner_int_updates (which also enables the consistency check,
+    see _verify_E_stars for the verify policies).
+    """
+
+    num_params = len(ciphertexts_U[0])
+
+    # Compute dynamic bsgs_bound from signed S if miner_int_updates available
+    dynamic_bounds = [None] * num_params
+    S_signed = None
+    if miner_int_updates is not None:
+        try:
+            S_signed, _ = weighted_update_sums(plan.weight_scaled_raw, miner_int_updates)
+            dynamic_bounds = [max(1024, abs(int(s)) + 16) for s in S_signed.tolist()]
+        except Exception:
+            pass  # Fall back to provided bsgs_bound
+
+    # engine mode keeps every intermediate point in Jacobian form
+    as_point = ECPoint.from_point if _use_jacobian() else (lambda pt: pt)
+
+    E_stars = []
+
+    # Aggregation plan: miners with identical scaled weights form one group whose
+    # ciphertexts are summed with plain point additions, so each group costs a single
+    # scalar multiplication per parameter (one in total for equal-weight rounds).
+    # Sparse submissions contribute their mask once (sparse_base) and only their
+    # stored entries add (U_ik - mask_i) on top of it.
+    groups = plan.groups
+    group_weights = [w_mod for w_mod, _ in groups]
+    group_dense = []
+    group_extra = []
+    group_mask_sums = []
+    for _, members in groups:
+        dense, extra, mask_sum = [], {}, None
+        for i in members:
+            miner_cts = ciphertexts_U[i]
+            if not isinstance(miner_cts, SparseCiphertext):
+                dense.append(miner_cts)
+                continue
+            mask_i = as_point(miner_cts.mask)
+            mask_sum = _add_points(mask_sum, mask_i)
+            neg_mask_i = safe_scalar_mul(mask_i, (-1) % N)
+            for idx, Uik in zip(miner_cts.indices.tolist(), miner_cts.points):
+                extra[idx] = _add_points(extra.get(idx), _add_points(as_point(Uik), neg_mask_i))
+        group_dense.append(dense)
+        group_extra.append(extra)
+        group_mask_sums.append(mask_sum)
+    sparse_base = _weighted_sum(group_mask_sums, group_weights)
+
+    for k in range(num_params):
+
+        # Reconstruct aggregate deterministically from ciphertexts and weights_mod
+        group_sums = []
+        for dense, extra in zip(group_dense, group_extra):
+            total = extra.get(k)
+            for miner_cts in dense:
+                total = _add_points(total, as_point(miner_cts[k]))
+            group_sums.append(total)
+        # weights already carry 1/sk_A; adding the (scaled, negated) global mask removes the FE mask
+        agg = _add_points(sparse_base, _weighted_sum(group_sums, group_weights))
+        E_star = _add_points(agg, plan.neg_global_star)
+        E_stars.append(E_star)
+
+    if _use_jacobian():
+        ECPoint.normalize_batch(E_stars)
+    if miner_int_updates is not None:
+        _verify_E_stars(plan, E_stars, miner_int_updates, verify, verify_samples, S_signed)
+    return E_stars, dynamic_bounds
+
+
+class DecryptSession:
+    """
+    Resumable decrypt for bound escalation.
+
+    The E* points (aggregation, mask removal, consistency check) are computed once.
+    solve(bound) only searches what earlier calls have not: solved parameters are
+    kept, and for the BSGS solver the range each parameter already walked is
+    skipped, so raising the bound walks just the new part of [-bound, bound].
+    """
+
+    def __init__(
+        self,
+        sk_FE: int,
+        sk_A: int,
+        pk_TP: object,
+        ciphertexts_U: List[List[object]],
+        weights_y: List[float],
+        scale_weights: int = 1,
+        miner_int_updates: List[np.ndarray] = None,
+        dlog_solver: str = "bsgs",
+        kangaroo_processes: int = 1,
+        index_sets: List[np.ndarray] = None,
+        plan: DecryptPlan = None,
+        verify: str = "full",
+        verify_samples: int = _VERIFY_SAMPLES
+    ):
+        if dlog_solver not in _DLOG_SOLVERS:
+            raise ValueError(f"unknown dlog_solver {dlog_solver!r}; expected one of {_DLOG_SOLVERS}")
+        _check_verify_mode(verify)
+        if plan is None or not plan.matches(sk_FE, sk_A, pk_TP, weights_y, scale_weights):
+            plan = DecryptPlan(sk_FE, sk_A, pk_TP, weights_y, scale_weights)
+        self.plan = plan
+        self.dlog_solver = dlog_solver
+        self.kangaroo_processes = kangaroo_processes
+        self.length = len(ciphertexts_U[0])
+        # index_sets: the flattened indices each miner submitted (e.g. from its DGC leaf).
+        # Only their union is decrypted; every other position is verified in bulk to
+        # be mask-only (aggregate 0).
+        self.positions = None
+        if index_sets is not None:
+            self.positions = np.unique(np.concatenate(
+                [_check_index_set(ix, self.length, i) for i, ix in enumerate(index_sets)]
+                + [np.zeros(0, dtype=np.int64)]))
+            rest = np.setdiff1d(np.arange(self.length, dtype=np.int64), self.positions, assume_unique=True)
+            if rest.size:
+                _verify_mask_only(plan, ciphertexts_U, rest)
+            ciphertexts_U = [_take_ciphertexts(cts, self.positions) for cts in ciphertexts_U]
+            if miner_int_updates is not None:
+                miner_int_updates = [np.asarray(upd)[self.positions] for upd in miner_int_updates]
+        self.E_stars, self.dynamic_bounds = _recover_E_stars(plan, ciphertexts_U, miner_int_updates,
+                                                             verify, verify_samples)
+        self.values = [None] * len(self.E_stars)
+        self._covered = [(0, -1)] * len(self.E_stars)
+
+    def __len__(self):
+        return len(self.E_stars)
+
+    @property
+    def unresolved(self) -> List[int]:
+        """Indices of the parameters not recovered yet (into the index union when one is used)."""
+        return [k for k, v in enumerate(self.values) if v is None]
+
+    def _param(self, k: int) -> int:
+        return k if self.positions is None else int(self.positions[k])
+
+    def solve(self, bound: int) -> np.ndarray:
+        """
+        Recover every unresolved parameter with |S_k| < bound.
+        Raises ValueError ("BSGS bound insufficient ...") if some remain unresolved;
+        the session keeps its progress, so call again with a larger bound.
+        """
+        pending = self.unresolved
+        if pending:
+            # near-zero aggregates: one table lookup each
+            self._probe_direct(pending)
+            pending = self.unresolved
+        if pending and self.dlog_solver == "kangaroo":
+            bounds_k = [self.dynamic_bounds[k] or bound for k in pending]
+            # signed S in [-bound, bound]: search E* + bound*G over [0, 2*bound]
+            shifted = [_add_points(self.E_stars[k], _base_mul(b)) for k, b in zip(pending, bounds_k)]
+            vals = kangaroo_solve_many(shifted, [2 * b + 1 for b in bounds_k], processes=self.kangaroo_processes)
+            for k, b, val in zip(pending, bounds_k, vals):
+                if val >= 0:
+                    self.values[k] = val - b
+            for k, b, val in zip(pending, bounds_k, vals):
+                if val < 0:
+                    raise ValueError(f"BSGS bound insufficient for param {self._param(k)} "
+                                     f"(dynamic_bound={b}, solver=kangaroo)")
+        elif pending:
+            # Signed BSGS: one centered walk resolves both signs (only where the
+            # range below bound has not been searched yet)
+            limit = bound - 1
+            pending = [k for k in pending if self._covered[k][0] > -limit or self._covered[k][1] < limit]
+            points = [self.E_stars[k] for k in pending]
+            covered = [self._covered[k] for k in pending]
+            results = [None] * len(pending)
+            if pending:
+                _signed_walk(points, bound, covered, results, self.plan.walk(bound))
+            for k, cov, val in zip(pending, covered, results):
+                self._covered[k] = cov
+                self.values[k] = val
+        for k in self.unresolved:
+            dynamic_bound = self.dynamic_bounds[k] or bound
+            raise ValueError(f"BSGS bound insufficient for param {self._param(k)} (dynamic_bound={dynamic_bound})")
+
+        values = np.array(self.values, dtype=np.int64)
+        if self.positions is None:
+            return values
+        recovered = np.zeros(self.length, dtype=np.int64)
+        recovered[self.positions] = values
+        return recovered
+
+    def _probe_direct(self, pending: List[int]):
+        """
+        Direct table probe for |S| <= T (always the one DIRECT_DLOG_BOUND table, whatever
+        the bound: hits are point-checked, so one beyond bound is still the value);
+        misses mark [-T, T] as searched for the walk and are not probed again.
+        """
+        T = DIRECT_DLOG_BOUND
+        if T <= 0:
+            return
+        pending = [k for k in pending if self._covered[k][0] > -T or self._covered[k][1] < T]
+        if not pending:
+            return
+        vals = direct_dlog_batch([self.E_stars[k] for k in pending], T)
+        for k, val in zip(pending, vals):
+            if val is not None:
+                self.values[k] = val
+            else:
+                lo, hi = self._covered[k]
+                self._covered[k] = (min(lo, -T), max(hi, T))
+
+
 # =====================================================================================
 #                     decrypt_aggregate — WITH NEGATIVE FALLBACK & CONSISTENCY
 # =====================================================================================
@@ -218,107 +2393,204 @@ def decrypt_aggregate(
     weights_y: List[float],
     scale_weights: int = 1,
     bsgs_bound: int = 1 << 20,
-    miner_int_updates: List[np.ndarray] = None
+    miner_int_updates: List[np.ndarray] = None,
+    dlog_solver: str = "bsgs",
+    kangaroo_processes: int = 1,
+    index_sets: List[np.ndarray] = None,
+    plan: DecryptPlan = None,
+    verify: str = "full",
+    verify_samples: int = _VERIFY_SAMPLES
 ) -> np.ndarray:
     """
     Robust decrypt_aggregate:
     - uses safe scalar ops
-    - performs modular consistency check (if miner_int_updates provided)
-    - uses cached BSGS with negative fallback
+    - performs modular consistency check (if miner_int_updates provided); verify
+      selects "full", "sample" (verify_samples random params), "aggregate" (one
+      random linear combination of all params) or "off"
+    - solves all parameters with one batched, signed (centered) BSGS walk
+    - dlog_solver="kangaroo" uses Pollard-lambda instead (constant memory, no baby
+      table; kangaroo_processes > 1 shares one distinguished-point table)
+    - index_sets (per-miner submitted indices) restricts decryption to their union;
+      the other positions get one bulk mask-only check and recover as 0
+    - plan: a DecryptPlan for these keys/weights to reuse across calls
+    One-shot wrapper around DecryptSession.
     """
+    session = DecryptSession(
+        sk_FE, sk_A, pk_TP, ciphertexts_U, weights_y,
+        scale_weights=scale_weights,
+        miner_int_updates=miner_int_updates,
+        dlog_solver=dlog_solver,
+        kangaroo_processes=kangaroo_processes,
+        index_sets=index_sets,
+        plan=plan,
+        verify=verify,
+        verify_samples=verify_samples
+    )
+    if len(session) == 0:
+        return np.zeros(session.length, dtype=np.int64)
+    # One batched walk for the whole vector; the largest per-param bound covers all of them
+    batch_bound = max(bsgs_bound if b is None else b for b in session.dynamic_bounds)
+    return session.solve(batch_bound)
 
-    num_params = len(ciphertexts_U[0])
-    # signed scaled weights (Python ints)
-    weight_scaled_raw = [int(round(w * scale_weights)) for w in weights_y]
-    # also keep mod-N scalars for EC multiplication
-    weight_scaled_mod = [ws % N for ws in weight_scaled_raw]
-
-    global_mask = safe_scalar_mul(pk_TP, sk_FE)
-    inv_sk_A = pow(sk_A, -1, N)
 
-    recovered = np.zeros(num_params, dtype=np.int64)
+# =====================================================================================
+#                         PROCESS-POOL WORKERS (chunked recovery)
+# =====================================================================================
+# Per-process decrypt inputs, set by _init_decrypt_worker in pool workers so tasks only
+# carry their own chunk. The sequential path passes its state explicitly instead.
+_DECRYPT_WORKER_STATE = {}
 
-    for k in range(num_params):
+# per-parameter aggregation/unmasking cost, expressed in giant steps
+_COST_PARAM_FIXED = 300.0
 
-        # Reconstruct aggregate deterministically from ciphertexts and weights_mod
-        agg = None
-        for miner_cts, w_mod in zip(ciphertexts_U, weight_scaled_mod):
-            Uik = miner_cts[k]
-            tmp = safe_scalar_mul(Uik, w_mod)
-            agg = tmp if agg is None else (agg + tmp if tmp is not None else agg)
-
-        # Remove FE mask
-        if agg is None:
-            E = None
-        else:
-            if global_mask is None:
-                E = agg
-            else:
-                neg_global = safe_scalar_mul(global_mask, (-1) % N)
-                E = agg if neg_global is None else (agg + neg_global)
 
-        # Remove pk_A factor
-        E_star = safe_scalar_mul(E, inv_sk_A)
+def _estimate_chunk_cost(length: int, bound: int, m: int) -> float:
+    """Rough decrypt cost of a chunk in giant-step units (used for scheduling)."""
+    return length * (_COST_PARAM_FIXED + bound / max(1, m))
 
-        # ---------- CONSISTENCY CHECK (robust, uses clipped modular encoding) ----------
-        # Miners encrypt clipped = int(x) % N, so we must use the same modular arithmetic
-        if miner_int_updates is not None:
-            try:
-                # Compute S_mod using clipped modular values (same as miner encryption)
-                S_mod = 0
-                for w_mod, upd in zip(weight_scaled_mod, miner_int_updates):
-                    clipped = int(upd[k]) % N  # Same encoding miners use
-                    S_mod = (S_mod + (w_mod * clipped)) % N
-
-                expected_point = safe_scalar_mul(G, S_mod)
-
-                # treat any representation of infinity as equal
-                if is_infinity(E_star) and is_infinity(expected_point):
-                    equal = True
-                else:
-                    equal = (E_star == expected_point)
-
-                if not equal:
-                    print(f"[ERROR] Modular consistency failed at param {k}")
-                    print(f"  S_mod (sum w_mod*clipped mod N) = {S_mod}")
-                    print(f"  expected_point = {fmt_point(expected_point)}")
-                    print(f"  E_star         = {fmt_point(E_star)}")
-                    raise ValueError(f"Encrypted point mismatch for param {k}: check miner ciphertexts / pk_A / pk_TP / sk_FE / scale_weights.")
-            except ValueError:
-                raise  # Re-raise ValueError (the mismatch error)
-            except Exception:
-                # Non-critical exception in diagnostic should not block
-                pass
-
-        # Compute dynamic bsgs_bound from signed S if miner_int_updates available
-        dynamic_bound = bsgs_bound
-        if miner_int_updates is not None:
-            try:
-                S_signed = 0
-                for w_raw, upd in zip(weight_scaled_raw, miner_int_updates):
-                    S_signed += int(w_raw) * int(upd[k])
-                dynamic_bound = max(1024, abs(S_signed) + 16)
-            except Exception:
-                pass  # Fall back to provided bsgs_bound
-
-        # Try positive BSGS with dynamic bound
-        val = bsgs_cached(E_star, dynamic_bound)
-
-        if val < 0:
-            neg_E_star = None if E_star is None else safe_scalar_mul(E_star, (-1) % N)
-            val2 = bsgs_cached(neg_E_star, dynamic_bound)
-            if val2 >= 0:
-                val = -val2
-            else:
-                raise ValueError(f"BSGS bound insufficient for param {k} (dynamic_bound={dynamic_bound})")
 
-        # Map signed representation
-        if val > N // 2:
-            val -= N
+def _share_baby_table(bound: int):
+    """
+    Make the baby table for bound available to worker processes.
+    Returns (table_ref, shm): persisted tables are shared through their memory-mapped
+    file, in-memory ones through a SharedMemory block (shm) the caller must unlink.
+    """
+    table, m = _precompute_babysteps(bound)
+    if table.path is not None:
+        return ("path", table.path, m), None
+    shm = table.to_shared_memory()
+    return ("shm", shm.name, m, len(table)), shm
+
+
+def _init_decrypt_worker(backend: str, table_ref, state: dict):
+    """Pool initializer: select the EC backend, map the shared baby table, keep the keys."""
+    set_ec_backend(backend)
+    set_direct_dlog_bound(state.get("direct_dlog_bound", DIRECT_DLOG_BOUND))
+    if table_ref[0] == "path":
+        _, path, m = table_ref
+        table = BabyStepTable.open(path, m) or _load_or_build_table(m)
+    else:
+        _, name, m, count = table_ref
+        table = BabyStepTable.attach_shared_memory(name, m, count)
+    _BABY_CACHE[m] = table
+    _DECRYPT_WORKER_STATE.update(state)
+    # one plan per worker process, reused by every chunk it solves
+    _DECRYPT_WORKER_STATE["plan"] = DecryptPlan(state["sk_FE"], state["sk_A"], state["pk_TP"],
+                                                state["weights_y"], state["scale_weights"])
+    # CiphertextVectors exported by the parent: map them once, chunks refer to them by index
+    _DECRYPT_WORKER_STATE["shared_cts"] = {
+        i: CiphertextVector.attach_shared_memory(name, length, compressed)
+        for i, (name, length, compressed) in state.get("shared_cts_refs", {}).items()
+    }
+
+
+def _solve_chunk_worker(start: int, end: int, chunk_cts, miner_updates_slice, bound: int):
+    st = _DECRYPT_WORKER_STATE
+    shared = st.get("shared_cts") or {}
+    # None marks a miner whose vector lives in shared memory
+    chunk_cts = [shared[i][start:end] if cts is None else cts for i, cts in enumerate(chunk_cts)]
+    return _solve_chunk(st, start, end, chunk_cts, miner_updates_slice, bound)
+
+
+def _solve_chunk(st: dict, start: int, end: int, chunk_cts, miner_updates_slice, bound: int):
+    """Decrypt one chunk with the keys, weights, plan and verify policy in st."""
+    return (start, end, decrypt_aggregate(
+        st["sk_FE"], st["sk_A"], st["pk_TP"],
+        chunk_cts, st["weights_y"],
+        scale_weights=st["scale_weights"],
+        bsgs_bound=bound,
+        miner_int_updates=miner_updates_slice,
+        plan=st.get("plan"),
+        verify=st.get("verify", "full"),
+        verify_samples=st.get("verify_samples", _VERIFY_SAMPLES)
+    ))
 
-        recovered[k] = val
 
-    return recovered
+# =====================================================================================
+#                         CHUNK AUTO-TUNING (chunk_size="auto")
+# =====================================================================================
+# Cost model in giant-step units (one walker step of the batched signed walk), on top
+# of _COST_PARAM_FIXED per parameter: a parameter above the direct table needs about
+# |S| / (2m - 1) steps on each of its two walkers, every walk iteration costs a chunk
+# _COST_WALK_ITER until its slowest parameter resolves, and every chunk costs
+# _COST_CHUNK_FIXED (session and walk setup, task dispatch, result transfer).
+_COST_WALK_ITER = 8.0
+_COST_CHUNK_FIXED = 400.0
+# chunk boundaries are chosen among the edges of at most this many equal blocks
+_AUTO_CHUNK_BLOCKS = 512
+# longest auto chunk: keeps per-chunk memory and streaming granularity bounded
+_AUTO_CHUNK_MAX_LEN = 1 << 14
+# parallel plans are searched with chunk cost limits of total / (workers * f)
+_AUTO_CHUNKS_PER_WORKER = (1, 2, 4, 8, 16)
+_AUTO_MIN_GAIN = 0.01
+
+
+def _lpt_makespan(costs: List[float], workers: int) -> float:
+    """Finish time of longest-processing-time-first scheduling on workers."""
+    loads = [0.0] * max(1, min(workers, len(costs)))
+    for cost in sorted(costs, reverse=True):
+        heapq.heapreplace(loads, loads[0] + cost)
+    return max(loads)
+
+
+def auto_chunks(magnitudes, workers: int = 1, m: int = None) -> Tuple[List[Tuple[int, int]], float]:
+    """
+    Non-uniform chunk boundaries for chunked decrypt from the per-parameter |S_k|.
+    Returns (chunks, predicted wall time in giant-step units). One worker minimizes
+    the summed chunk cost; several minimize the LPT makespan, so low-magnitude
+    regions stay in long chunks while expensive ones are split across workers.
+    m: baby-table size assumed for the walk (default: the table for the largest
+    bound, which the parallel path shares).
+    """
+    mags = np.abs(np.asarray(magnitudes).astype(np.float64))
+    L = len(mags)
+    if L == 0:
+        return [], 0.0
+    if m is None:
+        m = int(math.ceil(math.sqrt(max(float(mags.max()) + 16, 1024))))
+    steps = np.where(mags <= DIRECT_DLOG_BOUND, 0.0, np.floor(mags / (2 * m - 1)) + 1)
+    edges = np.unique(np.linspace(0, L, min(L, _AUTO_CHUNK_BLOCKS) + 1).round().astype(np.int64))
+    blocks = len(edges) - 1
+    work = np.concatenate(([0.0], np.cumsum(_COST_PARAM_FIXED + 2 * steps)))[edges]
+    block_max = np.maximum.reduceat(steps, edges[:-1])
+
+    def segment(limit):
+        # best[j]: cheapest split of blocks [0, j) with every chunk within limit
+        # (a single block is always allowed, whatever it costs)
+        best = np.full(blocks + 1, np.inf)
+        best[0] = 0.0
+        prev = np.zeros(blocks + 1, dtype=np.int64)
+        chunk_cost = np.zeros(blocks + 1)
+        for j in range(1, blocks + 1):
+            i0 = min(int(np.searchsorted(edges, edges[j] - _AUTO_CHUNK_MAX_LEN)), j - 1)
+            seg_max = np.maximum.accumulate(block_max[i0:j][::-1])[::-1]
+            cost = _COST_CHUNK_FIXED + (work[j] - work[i0:j]) + _COST_WALK_ITER * seg_max
+            total = best[i0:j] + np.where(cost <= limit, cost, np.inf)
+            total[-1] = best[j - 1] + cost[-1]
+            t = int(np.argmin(total))
+            best[j], prev[j], chunk_cost[j] = total[t], i0 + t, cost[t]
+        chunks, costs = [], []
+        j = blocks
+        while j > 0:
+            i = int(prev[j])
+            chunks.append((int(edges[i]), int(edges[j])))
+            costs.append(float(chunk_cost[j]))
+            j = i
+        return chunks[::-1], costs[::-1]
+
+    workers = max(1, int(workers))
+    chunks, costs = segment(np.inf)
+    if workers == 1:
+        return chunks, sum(costs)
+    total = sum(costs)
+    wall = _lpt_makespan(costs, workers)
+    for per_worker in _AUTO_CHUNKS_PER_WORKER:
+        cand, cand_costs = segment(total / (workers * per_worker))
+        cand_wall = _lpt_makespan(cand_costs, workers)
+        # finer plans must win clearly: near ties keep fewer chunks
+        if cand_wall < wall * (1 - _AUTO_MIN_GAIN):
+            chunks, wall = cand, cand_wall
+    return chunks, wall
 
 
 # =====================================================================================
@@ -332,44 +2604,106 @@ def decrypt_aggregate_chunked(
     weights_y: List[float],
     miner_int_updates: List[np.ndarray],
     scale_weights: int = 1,
-    chunk_size: int = 256,
+    chunk_size: Union[int, str] = 256,
     max_chunk_bound_cap: int = 1 << 28,
     parallel: bool = False,
+    max_workers: int = None,
+    plan: DecryptPlan = None,
+    verify: str = "full",
+    verify_samples: int = _VERIFY_SAMPLES,
 ) -> np.ndarray:
     """
     Recover entire vector in chunks.
     - Computes exact per-chunk bound from miners' integer deltas (Python ints)
     - Uses cached BSGS for big speedup.
-    - Optional parallel chunk solving.
+    - Optional parallel chunk solving on a process pool (max_workers defaults to all cores);
+      every worker maps one shared baby table sized for the largest chunk bound.
+    - chunk_size="auto" picks non-uniform chunks from the |S| distribution (auto_chunks)
+    Collects iter_decrypt_aggregate() into one array.
+    """
+    recovered = np.zeros(len(ciphertexts_U[0]), dtype=np.int64)
+    for start, end, vec in iter_decrypt_aggregate(
+        sk_FE, sk_A, pk_TP, ciphertexts_U, weights_y, miner_int_updates,
+        scale_weights=scale_weights,
+        chunk_size=chunk_size,
+        max_chunk_bound_cap=max_chunk_bound_cap,
+        parallel=parallel,
+        max_workers=max_workers,
+        plan=plan,
+        verify=verify,
+        verify_samples=verify_samples,
+    ):
+        recovered[start:end] = vec
+    return recovered
+
+
+def iter_decrypt_aggregate(
+    sk_FE: int,
+    sk_A: int,
+    pk_TP: object,
+    ciphertexts_U: List[List[object]],
+    weights_y: List[float],
+    miner_int_updates: List[np.ndarray] = None,
+    scale_weights: int = 1,
+    chunk_size: Union[int, str] = 256,
+    max_chunk_bound_cap: int = 1 << 28,
+    parallel: bool = False,
+    max_workers: int = None,
+    bsgs_bound: int = 1 << 20,
+    plan: DecryptPlan = None,
+    verify: str = "full",
+    verify_samples: int = _VERIFY_SAMPLES,
+):
     """
+    Chunked recovery as a stream: yields (start, end, vec) as chunks finish, so
+    callers can apply updates per chunk instead of holding the whole vector.
+    Parallel chunks arrive in completion order. Chunk bounds come from
+    miner_int_updates (bsgs_bound for every chunk without them) and are checked
+    against max_chunk_bound_cap before this returns; solving starts on iteration.
+    Sequential chunks share one DecryptPlan (plan, or built here); pool workers
+    build one each. verify/verify_samples apply per chunk (see decrypt_aggregate).
+    chunk_size="auto" sizes chunks with auto_chunks for the workers in use.
+    """
+    _check_verify_mode(verify)
+    if not (isinstance(chunk_size, str) and chunk_size == "auto"):
+        # any integral type (e.g. np.int64 from size computations), but not bool
+        if isinstance(chunk_size, (bool, np.bool_)) or not isinstance(chunk_size, numbers.Integral) \
+                or chunk_size <= 0:
+            raise ValueError(f"chunk_size must be a positive int or 'auto', got {chunk_size!r}")
+        chunk_size = int(chunk_size)
 
     L = len(ciphertexts_U[0])
     # keep Python ints for weight scaling (no modulo here; used for S calc)
     weight_scaled = [int(round(w * scale_weights)) for w in weights_y]
 
-    def compute_chunk_bound_py(start, end):
-        # Compute S per-index using Python ints (no overflow)
-        max_abs_S = 0
-        for idx in range(start, end):
-            s_val = 0
-            # sum using Python ints
-            for w, upd in zip(weight_scaled, miner_int_updates):
-                s_val += int(w) * int(upd[idx])
-            abs_s = abs(s_val)
-            if abs_s > max_abs_S:
-                max_abs_S = abs_s
+    # exact signed aggregate for the whole vector in one pass (int64 or Python ints)
+    S = None
+    if miner_int_updates is not None:
+        S, _ = weighted_update_sums(weight_scaled, miner_int_updates)
+
+    if chunk_size == "auto":
+        workers = (max_workers or os.cpu_count() or 1) if parallel else 1
+        chunks, predicted = auto_chunks(np.full(L, bsgs_bound) if S is None else S, workers)
+        print(f"[CHUNK] auto: {len(chunks)} chunks for {L} params, {workers} worker(s), predicted cost {predicted:.3g}")
+    else:
+        chunks = [(i, min(L, i + chunk_size)) for i in range(0, L, chunk_size)]
+
+    chunk_max_abs_S = None if S is None else _chunk_abs_max(S, [s for s, _ in chunks])
 
+    def compute_chunk_bound_py(c):
+        max_abs_S = chunk_max_abs_S[c]
         bound = max(max_abs_S + 16, 1024)
         # cap to avoid runaway
         capped = min(bound, max_chunk_bound_cap)
         hit_cap = (bound > max_chunk_bound_cap)
         return capped, max_abs_S, hit_cap
 
-    def solve_chunk(start, end):
-        chunk_cts = [miner[start:end] for miner in ciphertexts_U]
-
-        # Use Python-safe bound computation
-        bound, max_abs_S, hit_cap = compute_chunk_bound_py(start, end)
+    bounds = []
+    for c, (start, end) in enumerate(chunks):
+        if miner_int_updates is None:
+            bounds.append(bsgs_bound)
+            continue
+        bound, max_abs_S, hit_cap = compute_chunk_bound_py(c)
 
         # diagnostic logging (remove or reduce in production)
         print(f"[CHUNK] start={start} end={end} max_abs_S={max_abs_S} requested_bound={max(max_abs_S+16,1024)} used_bound={bound} hit_cap={hit_cap}")
@@ -381,31 +2715,68 @@ def decrypt_aggregate_chunked(
                 f"{max_chunk_bound_cap} for chunk [{start}:{end}]. "
                 "Either increase max_chunk_bound_cap, reduce chunk_size, or quantize/clip updates."
             )
+        bounds.append(bound)
 
-        # pass the per-chunk miner updates slice so decrypt_aggregate can do consistency and dynamic bound
-        miner_updates_slice = [upd[start:end] for upd in miner_int_updates]
-
-        return (start, end, decrypt_aggregate(
-            sk_FE, sk_A, pk_TP,
-            chunk_cts, weights_y,
-            scale_weights=scale_weights,
-            bsgs_bound=bound,
-            miner_int_updates=miner_updates_slice
-        ))
-
-    chunks = [(i, min(L, i + chunk_size)) for i in range(0, L, chunk_size)]
-    recovered = np.zeros(L, dtype=np.int64)
-
-    if parallel:
-        with ProcessPoolExecutor() as ex:
-            for start, end, vec in ex.map(lambda c: solve_chunk(*c), chunks):
-                recovered[start:end] = vec
-    else:
-        for start, end in chunks:
-            _, _, vec = solve_chunk(start, end)
-            recovered[start:end] = vec
+    state = dict(sk_FE=sk_FE, sk_A=sk_A, pk_TP=pk_TP, weights_y=weights_y, scale_weights=scale_weights,
+                 direct_dlog_bound=DIRECT_DLOG_BOUND, verify=verify, verify_samples=verify_samples)
+    return _iter_chunk_results(ciphertexts_U, miner_int_updates, chunks, bounds, state,
+                               parallel and len(chunks) > 1, max_workers, plan)
 
-    return recovered
+
+def _iter_chunk_results(ciphertexts_U, miner_int_updates, chunks, bounds, state, parallel, max_workers, plan):
+    shared_idx = set()
+
+    def chunk_args(c):
+        start, end = chunks[c]
+        # pass the per-chunk miner updates slice so decrypt_aggregate can do consistency and dynamic bound
+        return (start, end,
+                [None if i in shared_idx else miner[start:end] for i, miner in enumerate(ciphertexts_U)],
+                None if miner_int_updates is None else [upd[start:end] for upd in miner_int_updates],
+                bounds[c])
+
+    if not parallel:
+        # state stays local to this stream: concurrent streams must not see each other's keys
+        if plan is None or not plan.matches(state["sk_FE"], state["sk_A"], state["pk_TP"],
+                                            state["weights_y"], state["scale_weights"]):
+            plan = DecryptPlan(state["sk_FE"], state["sk_A"], state["pk_TP"],
+                               state["weights_y"], state["scale_weights"])
+        state = dict(state, plan=plan)
+        for c in range(len(chunks)):
+            yield _solve_chunk(state, *chunk_args(c))
+        return
+
+    # one baby table sized for the largest chunk bound, shared by every worker
+    table_ref, shm = _share_baby_table(max(bounds))
+    m_shared = table_ref[2]
+    # compact ciphertext vectors go to the workers through shared memory, not pickles
+    cts_shms = []
+    refs = {}
+    try:
+        for i, miner in enumerate(ciphertexts_U):
+            if isinstance(miner, CiphertextVector):
+                cts_shm = miner.to_shared_memory()
+                cts_shms.append(cts_shm)
+                refs[i] = (cts_shm.name, len(miner), miner.compressed)
+        shared_idx.update(refs)
+        state = dict(state, shared_cts_refs=refs)
+        # longest-processing-time-first scheduling keeps workers evenly loaded
+        order = sorted(range(len(chunks)),
+                       key=lambda c: _estimate_chunk_cost(chunks[c][1] - chunks[c][0], bounds[c], m_shared),
+                       reverse=True)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_decrypt_worker,
+                                 initargs=(EC_BACKEND, table_ref, state)) as ex:
+            futures = [ex.submit(_solve_chunk_worker, *chunk_args(c)) for c in order]
+            try:
+                for fut in as_completed(futures):
+                    yield fut.result()
+            finally:
+                # consumer stopped early (or a chunk failed): drop the queued chunks
+                for fut in futures:
+                    fut.cancel()
+    finally:
+        for block in ([shm] if shm is not None else []) + cts_shms:
+            block.close()
+            block.unlink()
 
 
 # =====================================================================================
@@ -13,8 +13,8 @@ from web3 import Web3
 from eth_account.messages import encode_defunct
 from integration.web3_client import Web3Client 
 
-# Crypto helpers: import decrypt_aggregate, decrypt_aggregate_chunked and key utilities
-from crypto.ndd_fe import key_gen, decrypt_aggregate, decrypt_aggregate_chunked, G, N, safe_scalar_mul, bsgs_cached
+# Crypto helpers: import decrypt_aggregate, iter_decrypt_aggregate and key utilities
+from crypto.ndd_fe import key_gen, decrypt_aggregate, iter_decrypt_aggregate, DecryptSession, DecryptPlan, weighted_update_sums, G, N, safe_scalar_mul, bsgs_cached
 from crypto.dgc import DGC 
 
 
@@ -24,7 +24,10 @@ class Aggregator:
                  account_address: str, 
                  validation_set,
                  max_rounds: int = 100,
-                 scale_weights: int = 1000):
+                 scale_weights: int = 1000,
+                 dlog_solver: str = "bsgs",
+                 verify: str = "aggregate",
+                 verify_samples: int = 32):
         
         # Generate Aggregator's keys using module-level function
         self.pk_A, self.sk_A = key_gen()
@@ -42,6 +45,14 @@ class Aggregator:
 
         # global scale_weights that must be identical for miners and aggregator (task metadata)
         self.scale_weights = scale_weights
+
+        # discrete-log solver for decrypt ("bsgs" or "kangaroo": constant memory for large bounds)
+        self.dlog_solver = dlog_solver
+
+        # consistency check of decrypted points when miner plaintexts are known:
+        # "aggregate" (one random linear combination per decrypt), "sample", "full" or "off"
+        self.verify = verify
+        self.verify_samples = verify_samples
         
         # --- FIX: Generate a local key for signing blocks in simulation ---
         # This prevents the need for os.environ variables and fixes the missing key error
@@ -54,20 +65,31 @@ class Aggregator:
         self._sk_FE_set = True  # Track that sk_FE was explicitly set
     
     # --- DGC Helper: Decompression (M4) ---
-    def dgc_decompress(self, recovered_vector: np.ndarray, model_shape: Tuple, scale: float = 1.0) -> np.ndarray:
+    def dgc_decompress(self, chunks, scale: float = 1.0):
         """
-        DGC Decompression (Algorithm 4, Line 33).
-        Restores the dense integer aggregated vector to float values matching the global model size.
+        DGC Decompression (Algorithm 4, Line 33), streamed.
+        Yields (start, end, float_update) for each (start, end, int_vec) chunk of the
+        flattened recovered aggregate (a dense vector is the single chunk (0, L, vec)).
         """
-        if recovered_vector is None:
-            return np.zeros(model_shape, dtype=np.float64)
-        
-        # Use decompress_from_dense_int to convert integer vector back to float
-        decompressed_update = self.dgc_tool.decompress_from_dense_int(
-            recovered_vector, model_shape, scale
-        )
-        
-        return decompressed_update
+        for start, end, vec in chunks:
+            yield start, end, self.dgc_tool.decompress_int_chunk(vec, scale)
+
+    def apply_update_stream(self, chunks, scale: float = 1.0) -> np.ndarray:
+        """
+        Streaming DGC decompression + model update: W_current + update, built from
+        (start, end, int_vec) chunks of the flattened aggregate as they are recovered.
+        Only the new model and one chunk are held at a time; W_current is not modified.
+        """
+        W_new = np.array(self.W_current, dtype=np.result_type(self.W_current, np.float64), copy=True)
+        flat = W_new.reshape(-1)
+        done = 0
+        for start, end, update in self.dgc_decompress(chunks, scale):
+            flat[start:end] += update
+            done += end - start
+            logging.info(f"[AGG] applied update [{start}:{end}] ({done}/{flat.size} params)")
+        if done != flat.size:
+            raise ValueError(f"Update stream covered {done} of {flat.size} parameters")
+        return W_new
 
     # --- Model Evaluation (M4) ---
     def evaluate_model(self, model_weights: np.ndarray) -> float:
@@ -89,7 +111,13 @@ class Aggregator:
                                       pk_TP: object, 
                                       weights_y: List[float], 
                                       acc_req: float,
-                                      miner_int_updates: List = None) -> Tuple[str, object]:
+                                      miner_int_updates: List = None,
+                                      index_sets: List = None) -> Tuple[str, object]:
+        """
+        index_sets: optional per-miner flattened indices each miner submitted (from its
+        DGC leaf). Decryption then covers only their union; the remaining positions are
+        verified in bulk as mask-only.
+        """
         
         if not self._sk_FE_set:
             raise ValueError("Functional key (sk_FE) not set for the current task.")
@@ -128,19 +156,15 @@ class Aggregator:
         # compute the exact per-call bsgs_bound using Python big-int arithmetic
         def compute_exact_bsgs_bound(miner_int_updates, weights_y, scale_weights=1, margin=16, min_bound=1024):
             w_scaled = [int(round(w * scale_weights)) for w in weights_y]
-            L = len(miner_int_updates[0])
-            max_abs_S = 0
-            for idx in range(L):
-                s = 0
-                for w, upd in zip(w_scaled, miner_int_updates):
-                    s += int(w) * int(upd[idx])
-                if abs(s) > max_abs_S:
-                    max_abs_S = abs(s)
+            _, (max_abs_S,) = weighted_update_sums(w_scaled, miner_int_updates)
             bound = max(min_bound, max_abs_S + margin)
             return bound, max_abs_S
 
         recovered_aggregate_vector = None
+        W_new = None
         scale_weights = self.scale_weights
+        # decrypt invariants (scaled weights, 1/sk_A, unmasking point) shared by every path below
+        plan = DecryptPlan(self.sk_FE, self.sk_A, pk_TP, weights_y, scale_weights)
 
         # Attempt fast path: if miner plaintexts are available, compute exact bound and try one-shot decrypt
         if miner_int_updates is not None:
@@ -156,7 +180,12 @@ class Aggregator:
                         weights_y=weights_y,
                         scale_weights=scale_weights,
                         bsgs_bound=bsgs_bound,
-                        miner_int_updates=miner_int_updates
+                        miner_int_updates=miner_int_updates,
+                        dlog_solver=self.dlog_solver,
+                        index_sets=index_sets,
+                        plan=plan,
+                        verify=self.verify,
+                        verify_samples=self.verify_samples
                     )
                 except ValueError as ve:
                     logging.warning(f"One-shot decrypt with exact bound {bsgs_bound} failed: {ve}")
@@ -165,13 +194,8 @@ class Aggregator:
                     try:
                         # Recompute S_list (signed ints) for diagnostics
                         L = len(miner_int_updates[0])
-                        S_list = [0] * L
                         w_scaled_raw = [int(round(w * scale_weights)) for w in weights_y]
-                        for i in range(len(miner_int_updates)):
-                            upd = miner_int_updates[i]
-                            w = w_scaled_raw[i]
-                            for idx in range(L):
-                                S_list[idx] += int(w) * int(upd[idx])
+                        S_list = [int(s) for s in weighted_update_sums(w_scaled_raw, miner_int_updates)[0].tolist()]
                         abs_vals = [abs(v) for v in S_list]
                         top_idxs = sorted(range(L), key=lambda i: abs_vals[i], reverse=True)[:6]
 
@@ -226,10 +250,11 @@ class Aggregator:
                     except Exception as e_diag:
                         logging.warning(f"[DIAG] diagnostics failed: {e_diag}")
 
-                    # Try chunked recovery as a robust fallback when one-shot fails
+                    # Try chunked recovery as a robust fallback when one-shot fails,
+                    # applying each chunk to the model as soon as it is recovered
                     try:
                         logging.info("[AGG] attempting chunked decrypt as fallback")
-                        recovered_aggregate_vector = decrypt_aggregate_chunked(
+                        W_new = self.apply_update_stream(iter_decrypt_aggregate(
                             self.sk_FE,
                             self.sk_A,
                             pk_TP,
@@ -237,10 +262,13 @@ class Aggregator:
                             weights_y,
                             miner_int_updates=miner_int_updates,
                             scale_weights=scale_weights,
-                            chunk_size=64,
+                            chunk_size="auto",
                             max_chunk_bound_cap=1 << 28,
-                            parallel=False
-                        )
+                            parallel=False,
+                            plan=plan,
+                            verify=self.verify,
+                            verify_samples=self.verify_samples
+                        ))
                         logging.info("[AGG] chunked decrypt succeeded")
                     except Exception as e_chunk:
                         logging.warning(f"[AGG] chunked decrypt fallback failed: {e_chunk}")
@@ -248,7 +276,7 @@ class Aggregator:
                 logging.warning(f"Failed to compute exact bsgs bound: {e}")
 
         # If we didn't recover yet, fall back to geometric retry (or chunked if available)
-        if recovered_aggregate_vector is None:
+        if recovered_aggregate_vector is None and W_new is None:
             # conservative per-parameter worst-case magnitude estimation if plaintext not available
             try:
                 from crypto.dgc import DGC as _DGC
@@ -263,19 +291,36 @@ class Aggregator:
             attempt_bound = min(computed_bound, 1 << 30)
             max_bound_cap = 1 << 34
             attempt = 0
+            # one session for all attempts: E* points are computed once and each retry
+            # only searches the range the previous bounds did not cover
+            def open_session(index_sets):
+                return DecryptSession(
+                    sk_FE=self.sk_FE,
+                    sk_A=self.sk_A,
+                    pk_TP=pk_TP,
+                    ciphertexts_U=ciphertexts_U,
+                    weights_y=weights_y,
+                    scale_weights=scale_weights,
+                    miner_int_updates=miner_int_updates,
+                    dlog_solver=self.dlog_solver,
+                    index_sets=index_sets,
+                    plan=plan,
+                    verify=self.verify,
+                    verify_samples=self.verify_samples
+                )
+            try:
+                session = open_session(index_sets)
+            except ValueError as ve:
+                if index_sets is None:
+                    raise
+                # malformed leaf or entries outside the union: decrypt every position instead
+                logging.warning(f"Index union rejected ({ve}); decrypting the full vector")
+                session = open_session(None)
             while attempt_bound <= max_bound_cap:
                 try:
-                    logging.info(f"Attempting FE decrypt with bsgs_bound={attempt_bound}")
-                    recovered_aggregate_vector = decrypt_aggregate(
-                        sk_FE=self.sk_FE,
-                        sk_A=self.sk_A,
-                        pk_TP=pk_TP,
-                        ciphertexts_U=ciphertexts_U,
-                        weights_y=weights_y,
-                        scale_weights=scale_weights,
-                        bsgs_bound=attempt_bound,
-                        miner_int_updates=miner_int_updates
-                    )
+                    logging.info(f"Attempting FE decrypt with bsgs_bound={attempt_bound} "
+                                 f"({len(session.unresolved)}/{len(session)} params unresolved)")
+                    recovered_aggregate_vector = session.solve(attempt_bound)
                     break
                 except ValueError as ve:
                     msg = str(ve)
@@ -291,13 +336,12 @@ class Aggregator:
                     else:
                         raise
 
-        if recovered_aggregate_vector is None:
+        if recovered_aggregate_vector is None and W_new is None:
             raise ValueError("Failed to recover aggregate vector: BSGS failed for all attempted bounds")
 
         # 3. DGC Decompress and Model Update (Algorithm 4, Lines 33-35)
-        decompressed_update = self.dgc_decompress(recovered_aggregate_vector, self.W_current.shape)
-        
-        W_new = self.W_current + decompressed_update
+        if W_new is None:
+            W_new = self.apply_update_stream([(0, recovered_aggregate_vector.size, recovered_aggregate_vector)])
         
         # 4. Evaluate Model Accuracy (Algorithm 4, Line 37)
         acc_calc = self.evaluate_model(W_new)
@@ -4,6 +4,7 @@ import numpy as np
 import random
 import time
 from typing import Tuple, Dict, List
+from concurrent.futures import ThreadPoolExecutor
 from eth_utils import keccak
 from web3 import Web3
 
@@ -13,20 +14,29 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from crypto.dgc import DGC, calculate_contribution_score_from_sparse
-from crypto.ndd_fe import key_gen, encrypt_integer_vector
+from crypto.ndd_fe import key_gen, encrypt_integer_vector, evict_shared_secrets, prepare_encryption_mask
 from integration.web3_client import Web3Client
 from integration.ipfs_handler import IPFSHandler
 
 class Miner:
-    def __init__(self, data_set, address: str, private_key: str = None):
+    def __init__(self, data_set, address: str, private_key: str = None, sparse_ciphertexts: bool = False,
+                 mask_lookahead: int = 0, ciphertext_format: str = None):
         """
         :param private_key: Required for signing on-chain transactions.
+        :param sparse_ciphertexts: Submit U_i as a SparseCiphertext (mask + non-zero entries only).
+        :param mask_lookahead: Number of upcoming ctr values whose encryption masks are precomputed
+            on a background thread during training (besides the current one); -1 disables it.
+            Only useful when ctr advances between rounds of a task.
+        :param ciphertext_format: "compressed" (33 B/point) or "affine" (64 B/point) submits U_i as a
+            compact CiphertextVector instead of a list of Point objects.
         """
         # Generate miner keys using module-level function
         self.pk_i, self.sk_i = key_gen()
         self.address = address
         self.private_key = private_key 
         self.data_set = data_set
+        self.sparse_ciphertexts = sparse_ciphertexts
+        self.ciphertext_format = ciphertext_format
         
         self.dgc_tool = DGC(tau=0.9, max_int=1023)
         self.web3_client = Web3Client()
@@ -40,6 +50,59 @@ class Miner:
         # Store reveal data for M7
         self.reveal_data = {} 
 
+        # Encryption masks precomputed in the background: (task_ID, ctr) -> Future
+        self.mask_lookahead = mask_lookahead
+        self._mask_pool = None  # started on first use, shut down when the task ends
+        self._mask_futures = {}
+
+    def precompute_masks(self, pk_TP, pk_A, task_ID: bytes, ctrs: List[int]):
+        """Start building the encryption masks for the given ctr values on the background thread."""
+        if self._mask_pool is None:
+            self._mask_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mask-precompute")
+        for ctr in ctrs:
+            key = (task_ID, int(ctr))
+            if key not in self._mask_futures:
+                self._mask_futures[key] = self._mask_pool.submit(
+                    prepare_encryption_mask, self.sk_i, pk_TP, pk_A, ctr, task_ID,
+                    max_int=self.dgc_tool.max_int
+                )
+
+    def _take_mask(self, task_ID: bytes, round_ctr: int):
+        """Precomputed mask for this round (waits for it if still running), or None."""
+        # masks of earlier rounds are never needed again
+        for key in [k for k in self._mask_futures if k[0] == task_ID and k[1] < round_ctr]:
+            self._mask_futures.pop(key).cancel()
+        fut = self._mask_futures.get((task_ID, round_ctr))
+        if fut is None:
+            return None
+        try:
+            return fut.result()
+        except Exception as e:
+            print(f"[Miner] Background mask precompute failed: {e}")
+            return None
+
+    def _drop_masks(self, task_ID: bytes = None):
+        """
+        Cancel the task's mask precomputes (all tasks if None) and wait for any already
+        running, so none can refill the shared-secret cache afterwards. The background
+        thread is shut down once no precompute is left.
+        """
+        for key in [k for k in self._mask_futures if task_ID is None or k[0] == task_ID]:
+            fut = self._mask_futures.pop(key)
+            if not fut.cancel():
+                try:
+                    fut.result()
+                except Exception:
+                    pass
+        if not self._mask_futures and self._mask_pool is not None:
+            self._mask_pool.shutdown(wait=True)
+            self._mask_pool = None
+
+    def close(self):
+        """Stop background mask precomputation and drop cached secrets of this miner."""
+        self._drop_masks()
+        evict_shared_secrets(self.sk_i)
+
     # M3: Local Model Training, Compression, Encryption, and Commit
     def run_training_round(self, 
                            W_t: np.ndarray, 
@@ -48,6 +111,10 @@ class Miner:
                            task_ID: bytes, 
                            round_ctr: int) -> Tuple[object, bytes, object, int, int]:
 
+        # Masks depend only on keys, ctr and task: build them while training runs
+        if self.mask_lookahead >= 0:
+            self.precompute_masks(pk_TP, pk_A, task_ID, range(round_ctr, round_ctr + 1 + self.mask_lookahead))
+
         # 1. Local Training (Simulated)
         raw_gradient = np.random.randn(*W_t.shape) * 0.01
 
@@ -116,6 +183,11 @@ class Miner:
             int_delta=dense_int_delta,
             ctr=round_ctr,
             task_id=task_ID,
+            # DGC clips to [-max_int, max_int]: encrypt by table lookup
+            max_int=self.dgc_tool.max_int,
+            sparse=self.sparse_ciphertexts,
+            prepared=self._take_mask(task_ID, round_ctr),
+            compact=self.ciphertext_format,
         )
 
         # Return the plaintext dense integer delta as last element to allow
@@ -190,6 +262,11 @@ class Miner:
             print(f"[Miner] Reveal failed: {e}")
             tx_info = {'status': 'failed', 'error': str(e)}
 
+        # task is over: stop the precomputed masks first (a running one would cache the
+        # ECDH secret again), then drop the secret cached for our masks
+        self._drop_masks(task_ID)
+        evict_shared_secrets(self.sk_i)
+
         return tx_info
 
     # New: generate_task_response uploads capability proof to IPFS
@@ -7,7 +7,7 @@ from eth_utils import keccak
 # Import your modules (adjust paths if necessary)
 from integration.web3_client import Web3Client 
 from crypto import ndd_fe
-from crypto.ndd_fe import key_gen, key_derive, curve
+from crypto.ndd_fe import key_gen, key_derive_many, curve
 from integration.ipfs_handler import IPFSHandler
 
 class TaskPublisher:
@@ -279,7 +279,7 @@ class TaskPublisher:
         print(f"✅ [TP] PoS Winner (Aggregator): {aggregator_addr[:10]}...")
         
         # Normalize public keys: if miners submitted simple strings (simulator),
-        # derive an EC point deterministically from the PK string so key_derive
+        # derive an EC point deterministically from the PK string so key_derive_many
         # can perform EC operations. Real deployments should pass proper EC points.
         normalized_pks = []
         for pk in public_keys:
@@ -316,12 +316,12 @@ class TaskPublisher:
         weights_y = [1.0 / h] * h
 
         # 4. Generate Functional Key sk_FE (Algorithm 2, Line 20)
-        # Using module-level key_derive function
+        # Batched key derivation: ECDH for large cohorts runs on a process pool
         # Use scale_weights=1000 to preserve weight precision while keeping values in BSGS bounds
         # With 3 miners, weights=[0.333...], scale=1000 -> scaled_weights=[333,333,333]
         # Max aggregated value ~= num_miners * max_int(1023) * 333 ~= 1M, within bsgs_bound
         print("[TP] Deriving sk_FE for Aggregator...")
-        sk_FE = key_derive(
+        sk_FE = key_derive_many(
             sk_TP=self.sk_TP, 
             pk_miners=miner_pks, 
             weights_y=weights_y, 
@@ -371,6 +371,9 @@ class TaskPublisher:
         )
         print("[TP] Task revealed successfully.")
 
+        # task is over: drop the ECDH secrets cached by key_derive_many for this TP key
+        ndd_fe.evict_shared_secrets(self.sk_TP)
+
     def interactive_publish(self, task_ID: bytes,
                             default_acc_req: float = 92.0,
                             default_reward: float = 10.0,
@@ -204,6 +204,7 @@ def run_healchain_simulation(publisher, aggregator, miners, pk_A, web3_client, p
         # The encryption mask depends on ctr via derive_ri_from_shared, so it must match
         submissions = []
         miner_int_updates = []
+        index_sets = []
         for miner in valid_miners:
             U_i, score_commit, pk_i, score_int, nonce_i = miner.run_training_round(
                 W_t, pk_TP, pk_A, task_ID, sk_FE_ctr
@@ -223,13 +224,17 @@ def run_healchain_simulation(publisher, aggregator, miners, pk_A, web3_client, p
             except Exception:
                 dense = np.zeros(int(np.prod(W_t.shape)), dtype=np.int64)
             miner_int_updates.append(dense)
+            # indices each miner submitted: the aggregator decrypts only their union
+            idxs = getattr(miner, '_last_indices', None)
+            index_sets.append(np.asarray(idxs if idxs is not None else np.flatnonzero(dense), dtype=np.int64))
 
         # M4: Aggregation
         # `acc_req` returned from the TP prompt is a percentage (e.g. 82.76).
         # Aggregator.evaluate_model returns a fractional accuracy (0.82..), so convert here.
         acc_req_fraction = float(acc_req) / 100.0
         status, result = aggregator.secure_aggregate_and_evaluate(
-            task_ID, submissions, pk_TP, weights_y, acc_req_fraction, miner_int_updates=miner_int_updates
+            task_ID, submissions, pk_TP, weights_y, acc_req_fraction, miner_int_updates=miner_int_updates,
+            index_sets=index_sets
         )
         W_t = aggregator.W_current
         
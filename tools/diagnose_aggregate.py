@@ -6,6 +6,7 @@ import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from integration.simulation_runner import setup_environment
+from crypto.ndd_fe import weighted_update_sums
 
 
 def reconstruct_dense_from_miner(miner):
@@ -24,12 +25,7 @@ def reconstruct_dense_from_miner(miner):
 def compute_S_exact(miner_int_updates, weights, scale_weights=1, top_n=20):
     w_scaled = [int(round(w * scale_weights)) for w in weights]
     L = miner_int_updates[0].size
-    S = [0] * L
-    for i in range(len(miner_int_updates)):
-        upd = miner_int_updates[i]
-        w = w_scaled[i]
-        for idx in range(L):
-            S[idx] += int(w) * int(upd[idx])
+    S = [int(s) for s in weighted_update_sums(w_scaled, miner_int_updates)[0].tolist()]
     abs_vals = [abs(v) for v in S]
     max_abs = max(abs_vals) if abs_vals else 0
     max_idx = abs_vals.index(max_abs) if abs_vals else None
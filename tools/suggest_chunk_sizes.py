@@ -7,6 +7,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from integration.simulation_runner import setup_environment
+from crypto.ndd_fe import weighted_update_sums, auto_chunks
 
 
 def reconstruct_dense_from_miner(miner):
@@ -59,6 +60,13 @@ def suggest_chunk_sizes(miners_deltas, weights_y, original_L, start_chunk=256, c
     return feasible, last_max
 
 
+def suggest_auto_chunks(miners_deltas, weights_y, scale_weights=1000, workers=1):
+    # non-uniform chunks the decrypt would use with chunk_size='auto'
+    weight_scaled = [int(round(w * scale_weights)) for w in weights_y]
+    S, _ = weighted_update_sums(weight_scaled, miners_deltas)
+    return auto_chunks(S, workers)
+
+
 if __name__ == '__main__':
     publisher, aggregator, miners, pk_A, web3_client = setup_environment()
 
@@ -105,3 +113,10 @@ if __name__ == '__main__':
         print(f"Example max_abs in last feasible chunk: {example_max_abs}")
     else:
         print("No chunk tested or no data")
+
+    workers = os.cpu_count() or 1
+    for w in sorted({1, workers}):
+        chunks, predicted = suggest_auto_chunks(miners_deltas, weights_y, scale_weights=1000, workers=w)
+        sizes = [e - s for s, e in chunks]
+        print(f"chunk_size='auto' with {w} worker(s): {len(chunks)} chunks "
+              f"(sizes {min(sizes)}..{max(sizes)}), predicted cost {predicted:.3g} giant steps")